@@ -0,0 +1,54 @@
+"""
+Compares the memory which is needed per edge by the raw result dictionaries with the compact edges
+which only keep the projected node fields.
+
+    python -m benchmarks.compact_edges --edges 100000 --fields value --json
+"""
+import argparse
+import gc
+import json
+import tracemalloc
+from gql_relay_result.relay_result import DataFactory
+from benchmarks.fake_relay import FakeRelayConnection
+
+
+def retained_bytes(create):
+    gc.collect()
+    tracemalloc.start()
+    data = create()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--edges", type=int, default=100000)
+    parser.add_argument("--payload-size", type=int, default=32)
+    parser.add_argument("--fields", nargs="+", default=["value"])
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    connection = FakeRelayConnection(args.edges, payload_size=args.payload_size)
+    raw_bytes = retained_bytes(lambda: connection.page(args.edges))
+    # the raw page is dropped after the conversion, so the field values are only kept by the compact edges
+    compact_bytes = retained_bytes(lambda: DataFactory.compact(DataFactory.from_result(connection.page(args.edges)), args.fields))
+    results = {
+        "edges": args.edges,
+        "fields": args.fields,
+        "dict_bytes_per_edge": raw_bytes / args.edges,
+        "compact_bytes_per_edge": compact_bytes / args.edges,
+    }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"edges: {args.edges}, fields: {', '.join(args.fields)}")
+    print(f"dict storage:    {results['dict_bytes_per_edge']:8.1f} bytes per edge")
+    print(f"compact storage: {results['compact_bytes_per_edge']:8.1f} bytes per edge")
+
+
+if __name__ == "__main__":
+    main()
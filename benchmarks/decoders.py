@@ -0,0 +1,61 @@
+"""
+Compares the installed decoders for raw responses by decoding synthetic large pages.
+
+    python -m benchmarks.decoders --edges 5000 --repeat 20 --json
+"""
+import argparse
+import json
+import time
+from gql_relay_result.decoders import DECODERS, MsgspecDecoder
+from benchmarks.fake_relay import FakeRelayConnection
+
+
+def available_decoders():
+    decoders = {}
+    for name, decoder in DECODERS.items():
+        try:
+            decoders[name] = decoder()
+        except ImportError:
+            pass
+
+    if MsgspecDecoder.name in decoders:
+        decoders["msgspec (partial)"] = MsgspecDecoder(partial=True)
+
+    return decoders
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--edges", type=int, default=5000)
+    parser.add_argument("--payload-size", type=int, default=64)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    connection = FakeRelayConnection(args.edges, payload_size=args.payload_size)
+    # the response contains another large field which isn't part of the connection
+    data = connection.page(args.edges)
+    data["viewer"] = {"settings": ["x" * args.payload_size] * args.edges}
+    raw = json.dumps({"data": data}).encode("utf-8")
+    path = (connection.connection,)
+
+    results = []
+    for name, decoder in available_decoders().items():
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            decoder.decode(raw, path)
+
+        seconds = (time.perf_counter() - start) / args.repeat
+        results.append({"decoder": name, "bytes": len(raw), "seconds_per_page": seconds, "mb_per_second": len(raw) / seconds / 1e6})
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"page size: {len(raw)} bytes, {args.edges} edges")
+    for x in results:
+        print(f"{x['decoder']:>18} {x['seconds_per_page'] * 1000:10.2f} ms {x['mb_per_second']:10.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Compares a CPU-heavy factory method running inline on the event loop with the same factory running
+in a thread pool and in a process pool by the factory_executor option, while the next page is prefetched.
+
+    python -m benchmarks.factory_pool --edges 20000 --rounds 200 --workers 2 4 --json
+"""
+import argparse
+import asyncio
+import concurrent.futures
+import hashlib
+import json
+import os
+import time
+from gql_relay_result import GqlRelayResult, IterableResult
+from benchmarks.fake_relay import FakeRelayConnection
+
+QUERY = """
+    query getItems($first: Int, $after: String) {
+        items(first: $first, after: $after) {
+            pageInfo { hasNextPage, hasPreviousPage, startCursor, endCursor }
+            edges { node { id, value, payload } }
+        }
+    }
+    """
+
+ROUNDS = 200
+
+
+def validate(edge):
+    # stands in for heavy validation and model construction
+    node = edge["node"]
+    digest = node["id"].encode("utf-8")
+    for _ in range(ROUNDS):
+        digest = hashlib.sha256(digest).digest()
+
+    return (node["id"], node["value"], digest[:4].hex())
+
+
+def init_worker(rounds):
+    global ROUNDS
+    ROUNDS = rounds
+
+
+async def traverse(args, pool):
+    connection = FakeRelayConnection(args.edges, payload_size=args.payload_size, latency=args.latency)
+    result = GqlRelayResult.from_query(QUERY, {"first": args.page_size}, connection.execute, validate, prefetch=1,
+                                       factory_executor=pool, factory_chunk_size=args.chunk_size)
+    return len(await IterableResult.fetch_all(result))
+
+
+def measure(args, mode, workers):
+    pool = None
+    if mode == "threads":
+        pool = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+    elif mode == "processes":
+        pool = concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(args.rounds,))
+
+    try:
+        start = time.perf_counter()
+        items = asyncio.run(traverse(args, pool))
+        seconds = time.perf_counter() - start
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    return {"mode": mode, "workers": workers, "items": items, "seconds": seconds, "items_per_second": items / seconds}
+
+
+def main():
+    global ROUNDS
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--edges", type=int, default=20000)
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--payload-size", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.01, help="simulated seconds per page request")
+    parser.add_argument("--rounds", type=int, default=200, help="sha256 rounds per edge which the factory method runs")
+    parser.add_argument("--chunk-size", type=int, default=250)
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, os.cpu_count() or 1])
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+    ROUNDS = args.rounds
+
+    inline = measure(args, "inline", 1)
+    results = [inline] + [measure(args, mode, workers) for mode in ("threads", "processes") for workers in sorted(set(args.workers))]
+    for x in results:
+        x["speedup"] = x["items_per_second"] / inline["items_per_second"]
+
+    if args.json:
+        print(json.dumps({"cpu_count": os.cpu_count(), "results": results}, indent=2))
+        return
+
+    print(f"cpus: {os.cpu_count()}")
+    print(f"{'mode':>10} {'workers':>8} {'items/s':>10} {'speedup':>8}")
+    for x in results:
+        print(f"{x['mode']:>10} {x['workers']:>8} {x['items_per_second']:>10.0f} {x['speedup']:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
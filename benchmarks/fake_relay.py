@@ -0,0 +1,86 @@
+import asyncio
+import random
+from gql_relay_result.cursors import cursor_to_offset, offset_to_cursor
+
+CHILDREN_TOKEN = "children"
+
+
+class FakeRelayConnection:
+    """
+    an in-process stand-in for a relay connection which creates the requested pages on the fly,
+    its execute method can be passed as executor to a GqlRelayResult and its resolve_children method as resolver to a SubResult
+    """
+
+    def __init__(self, total, connection="items", payload_size=0, latency=0.0, jitter=0.0, failure_rate=0.0, children=0, child_page_size=10, depth=0, seed=None) -> None:
+        """Create a new connection
+
+        Keyword arguments:
+        total -- the number of edges of the connection
+        connection -- the name of the connection within the result
+        payload_size -- the length of a string which is added to every node
+        latency -- the simulated time in seconds every request takes
+        jitter -- a random time between 0 and jitter seconds which is added to the latency
+        failure_rate -- the probability that a request fails with a ConnectionError
+        children -- the number of child edges of every node, the child connections are only added if depth is at least 1
+        child_page_size -- the number of child edges which are embedded in a node, the remaining ones are fetched by resolve_children
+        depth -- the number of nested child connection levels
+        seed -- the seed of the random numbers for the jitter and the failures
+        """
+        self.total = total
+        self.connection = connection
+        self.payload = "x" * payload_size
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.children = children
+        self.child_page_size = child_page_size
+        self.depth = depth
+        self._random = random.Random(seed)
+        self.requests = 0
+        self.failures = 0
+
+    def _node(self, id, offset, level):
+        node = {"id": id, "value": float(offset), "payload": self.payload}
+        if level < self.depth and self.children > 0:
+            node[CHILDREN_TOKEN] = self._connection(id, self.children, self.child_page_size, None, level + 1)
+
+        return node
+
+    def _connection(self, parent, total, first, after, level):
+        start = 0 if after is None else cursor_to_offset(after) + 1
+        end = min(start + first, total)
+        ids = [str(i) if parent is None else f"{parent}.{i}" for i in range(start, end)]
+        return {
+            "edges": [{"cursor": offset_to_cursor(i), "node": self._node(id, i, level)} for i, id in zip(range(start, end), ids)],
+            "pageInfo": {
+                "startCursor": offset_to_cursor(start) if end > start else None,
+                "endCursor": offset_to_cursor(end - 1) if end > start else None,
+                "hasNextPage": end < total,
+                "hasPreviousPage": start > 0,
+            }
+        }
+
+    def page(self, first, after=None) -> dict:
+        return {self.connection: self._connection(None, self.total, first, after, 0)}
+
+    async def _simulate(self):
+        self.requests += 1
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter > 0 else 0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if self.failure_rate > 0 and self._random.random() < self.failure_rate:
+            self.failures += 1
+            raise ConnectionError("simulated failure")
+
+    async def execute(self, query, params):
+        await self._simulate()
+        return self.page(params["first"], params.get("after"))
+
+    async def resolve_children(self, id, after=None, **kwargs):
+        """
+        returns all child edges of the node with the given id after the cursor
+        """
+        await self._simulate()
+        level = id.count(".") + 1
+        return self._connection(id, self.children, self.children, after, level)["edges"]
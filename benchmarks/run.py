@@ -0,0 +1,133 @@
+"""
+Runs GqlRelayResult and SubResult traversals against the in-process fake relay connection and measures
+the items per second, the time to the first item, the peak memory and the number of requests of every scenario.
+
+    python -m benchmarks.run --edges 10000 --page-sizes 100 1000 --latency 0.002 --jitter 0.002 --failure-rate 0.01 --depth 2 --children 20
+    python -m benchmarks.run --output results.json
+
+The results of different versions can be compared by the written JSON files.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from gql_relay_result import GqlRelayResult, RetryPolicy, SubResult
+from benchmarks.fake_relay import CHILDREN_TOKEN, FakeRelayConnection
+
+QUERY = """
+    query getItems($first: Int, $after: String) {
+        items(first: $first, after: $after) {
+            pageInfo { hasNextPage, hasPreviousPage, startCursor, endCursor }
+            edges { cursor, node { id, value, payload } }
+        }
+    }
+    """
+
+
+def version():
+    try:
+        from importlib.metadata import version
+        return version("gql-relay-result")
+    except Exception:
+        return "unknown"
+
+
+async def resolve_children(connection, nodes, retry):
+    # resolves the child connections of all nodes level by level and returns the number of children
+    count = 0
+    while nodes:
+        children = await SubResult.get_all_children_from_nodes(
+            nodes, CHILDREN_TOKEN, lambda node: {"id": node["id"]}, connection.resolve_children, lambda x: x["node"], retry=retry)
+        nodes = [x for items in children for x in items]
+        count += len(nodes)
+
+    return count
+
+
+async def traverse(scenario, connection):
+    """
+    returns the number of items and the seconds until the first item has been created
+    """
+    retry = RetryPolicy(attempts=10, base_delay=0, jitter=False) if connection.failure_rate > 0 else None
+    result = GqlRelayResult.from_query(QUERY, {"first": scenario["page_size"]}, connection.execute, lambda x: x["node"], retry=retry)
+    start = time.perf_counter()
+    first_item = None
+    count = 0
+    async for items, _ in result.pages():
+        if first_item is None and items:
+            first_item = time.perf_counter() - start
+
+        count += len(items)
+        if scenario["kind"] == "subresult":
+            count += await resolve_children(connection, items, retry)
+
+    return count, first_item
+
+
+def run_scenario(scenario, args):
+    connection = FakeRelayConnection(args.edges, payload_size=args.payload_size, latency=args.latency, jitter=args.jitter,
+                                     failure_rate=args.failure_rate, children=args.children, child_page_size=args.child_page_size,
+                                     depth=args.depth if scenario["kind"] == "subresult" else 0, seed=args.seed)
+    tracemalloc.start()
+    start = time.perf_counter()
+    items, first_item = asyncio.run(traverse(scenario, connection))
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return dict(scenario, **{
+        "items": items,
+        "seconds": seconds,
+        "items_per_second": items / seconds if seconds > 0 else 0.0,
+        "time_to_first_item": first_item,
+        "peak_memory_bytes": peak,
+        "requests": connection.requests,
+        "failures": connection.failures,
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--edges", type=int, default=10000)
+    parser.add_argument("--page-sizes", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--payload-size", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated seconds per request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random additional seconds per request")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="probability of a failed request, failed requests are retried")
+    parser.add_argument("--depth", type=int, default=1, help="nesting depth of the child connections of the subresult scenarios")
+    parser.add_argument("--children", type=int, default=20, help="child edges per node")
+    parser.add_argument("--child-page-size", type=int, default=5, help="child edges which are embedded in a node")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--kinds", nargs="+", choices=["relay", "subresult"], default=["relay", "subresult"])
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    parser.add_argument("--output", help="write the machine-readable results to this file")
+    args = parser.parse_args()
+
+    scenarios = [{"kind": kind, "page_size": page_size} for kind in args.kinds for page_size in args.page_sizes]
+    report = {
+        "version": version(),
+        "python": platform.python_version(),
+        "parameters": {k: v for k, v in vars(args).items() if k not in ("json", "output")},
+        "results": [run_scenario(x, args) for x in scenarios],
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+        return
+
+    print(f"{'kind':>10} {'page size':>10} {'items':>9} {'items/s':>12} {'first item (ms)':>16} {'peak memory (kb)':>17} {'requests':>9}")
+    for x in report["results"]:
+        first_item = x["time_to_first_item"] * 1000 if x["time_to_first_item"] is not None else float("nan")
+        print(f"{x['kind']:>10} {x['page_size']:>10} {x['items']:>9} {x['items_per_second']:>12.0f} {first_item:>16.2f} "
+              f"{x['peak_memory_bytes'] // 1024:>17} {x['requests']:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Measures the peak RSS of a complete traversal for growing result sizes, collecting all items by fetch_all
+compared to the streaming mode writing all items to a sink by fetch_into. Every measurement runs in a new process.
+
+    python -m benchmarks.streaming --sizes 10000 100000 1000000 --json
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+from gql_relay_result import GqlRelayResult, IterableResult
+from benchmarks.fake_relay import FakeRelayConnection
+
+QUERY = """
+    query getItems($first: Int, $after: String) {
+        items(first: $first, after: $after) {
+            pageInfo { hasNextPage, hasPreviousPage, startCursor, endCursor }
+            edges { node { id, value, payload } }
+        }
+    }
+    """
+
+
+async def traverse(mode, total, page_size, payload_size):
+    connection = FakeRelayConnection(total, payload_size=payload_size)
+    factory = lambda x: x["node"]
+    if mode == "streaming":
+        result = GqlRelayResult.from_query(QUERY, {"first": page_size}, connection.execute, factory, streaming=True)
+        with open(os.devnull, "w") as sink:
+            return await IterableResult.fetch_into(result, sink)
+
+    result = GqlRelayResult.from_query(QUERY, {"first": page_size}, connection.execute, factory)
+    return len(await IterableResult.fetch_all(result))
+
+
+def peak_rss_kb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on linux
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def measure(mode, total, page_size, payload_size):
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.streaming", "--child", mode, str(total), str(page_size), str(payload_size)],
+        check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 500000])
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--payload-size", type=int, default=100)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    parser.add_argument("--child", nargs=4, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, total, page_size, payload_size = args.child[0], int(args.child[1]), int(args.child[2]), int(args.child[3])
+        count = asyncio.run(traverse(mode, total, page_size, payload_size))
+        print(json.dumps({"mode": mode, "items": count, "peak_rss_kb": peak_rss_kb()}))
+        return
+
+    results = [measure(mode, total, args.page_size, args.payload_size) for total in args.sizes for mode in ("fetch_all", "streaming")]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'items':>10} {'mode':>10} {'peak rss (kb)':>14}")
+    for x in results:
+        print(f"{x['items']:>10} {x['mode']:>10} {x['peak_rss_kb']:>14}")
+
+
+if __name__ == "__main__":
+    main()
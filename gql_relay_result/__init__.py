@@ -1,7 +1,32 @@
-from .relay_result import GqlRelayResult
+from .cache import MemoryPageCache, PageCache, SqlitePageCache
+from .decoders import GraphQLResponseError, get_decoder
+from .observers import CompositeObserver, MetricsCollector, RelayObserver
+from .pipeline import Pipeline
+from .scheduler import RequestScheduler
+from .sync import JsonFileStateStore, MemoryStateStore, SyncStateStore
+from .relay_result import AdaptivePageSize, CompactEdge, ConnectionPath, GqlRelayResult, IterableResult, PageFetchError, RetryPolicy, SeekableRelayResult, SubResult
 
 __all__ = [
+    "AdaptivePageSize",
+    "CompactEdge",
+    "CompositeObserver",
+    "ConnectionPath",
     "IterableResult",
     "GqlRelayResult",
+    "GraphQLResponseError",
+    "JsonFileStateStore",
+    "MemoryStateStore",
+    "MetricsCollector",
+    "MemoryPageCache",
+    "PageCache",
+    "PageFetchError",
+    "Pipeline",
+    "RelayObserver",
+    "RequestScheduler",
+    "RetryPolicy",
+    "SeekableRelayResult",
+    "SqlitePageCache",
     "SubResult",
+    "SyncStateStore",
+    "get_decoder",
 ]
\ No newline at end of file
@@ -0,0 +1,195 @@
+# Copyright (c) 2020 UniversalAppFactory
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from graphql import print_ast
+
+
+def query_text(query) -> str:
+    """
+    returns the text of a query which can be a string, a parsed document or a gql request
+    """
+    document = getattr(query, "document", query)
+    if isinstance(document, str):
+        return document
+
+    return print_ast(document)
+
+
+def page_key(text, params, cursor_param="after") -> str:
+    """
+    returns the cache key of a page which is built from the query text, the variables without the cursor and the cursor
+    """
+    variables = {k: v for k, v in params.items() if k != cursor_param}
+    payload = json.dumps([text, variables, params.get(cursor_param)], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PageCache(ABC):
+    """
+    base class for page caches, the pages are stored as raw result dictionaries,
+    a page which can't be stored, e.g. because it contains values which can't be encoded as JSON, is counted as an error
+    and not cached instead of failing the request which has fetched it
+    """
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.errors = 0
+
+    @abstractmethod
+    def get(self, key):
+        pass
+
+    @abstractmethod
+    def set(self, key, page):
+        pass
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "errors": self.errors}
+
+
+class MemoryPageCache(PageCache):
+
+    def __init__(self, max_size=128, ttl=None) -> None:
+        """Create a new in-memory cache which evicts the least recently used pages
+
+        Keyword arguments:
+        max_size -- the maximum number of pages
+        ttl -- the time to live of a page in seconds, pages don't expire if it's None
+        """
+        super(MemoryPageCache, self).__init__()
+        self.max_size = max_size
+        self.ttl = ttl
+        self._pages = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._pages.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires, page = entry
+            if expires is not None and expires < time.monotonic():
+                del self._pages[key]
+                self.evictions += 1
+                self.misses += 1
+                return None
+
+            self._pages.move_to_end(key)
+            self.hits += 1
+
+        # pages are stored encoded so that factory methods can't modify the cached page
+        return json.loads(page)
+
+    def set(self, key, page):
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        try:
+            encoded = json.dumps(page)
+        except (TypeError, ValueError):
+            self.errors += 1
+            return
+
+        with self._lock:
+            self._pages[key] = (expires, encoded)
+            self._pages.move_to_end(key)
+            while len(self._pages) > self.max_size:
+                self._pages.popitem(last=False)
+                self.evictions += 1
+
+    def __len__(self):
+        return len(self._pages)
+
+
+class SqlitePageCache(PageCache):
+
+    def __init__(self, path, max_size=None, ttl=None) -> None:
+        """Create a new cache which stores the pages in a sqlite database, so it can be shared by many runs and workers
+
+        The database is read and written synchronously on the thread of the event loop, so it should be on a local disk.
+
+        Keyword arguments:
+        path -- the path of the database file
+        max_size -- the maximum number of pages, the oldest pages are evicted first, there is no limit if it's None
+        ttl -- the time to live of a page in seconds, pages don't expire if it's None
+        """
+        super(SqlitePageCache, self).__init__()
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("CREATE TABLE IF NOT EXISTS pages (key TEXT PRIMARY KEY, page TEXT NOT NULL, created REAL NOT NULL)")
+        self._connection.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._connection.execute("SELECT page, created FROM pages WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            page, created = row
+            if self.ttl is not None and created + self.ttl < time.time():
+                self._connection.execute("DELETE FROM pages WHERE key = ?", (key,))
+                self._connection.commit()
+                self.evictions += 1
+                self.misses += 1
+                return None
+
+            self.hits += 1
+
+        return json.loads(page)
+
+    def set(self, key, page):
+        try:
+            encoded = json.dumps(page)
+        except (TypeError, ValueError):
+            self.errors += 1
+            return
+
+        with self._lock:
+            try:
+                self._connection.execute("INSERT OR REPLACE INTO pages (key, page, created) VALUES (?, ?, ?)", (key, encoded, time.time()))
+                if self.max_size is not None:
+                    cursor = self._connection.execute(
+                        "DELETE FROM pages WHERE key IN (SELECT key FROM pages ORDER BY created DESC LIMIT -1 OFFSET ?)", (self.max_size,))
+                    self.evictions += cursor.rowcount
+
+                self._connection.commit()
+            except sqlite3.Error:
+                # e.g. a locked or full database, the page has been fetched anyway
+                self._connection.rollback()
+                self.errors += 1
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,49 @@
+# Copyright (c) 2020 UniversalAppFactory
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+import base64
+import binascii
+
+# the prefix of the offset cursors created by graphql-relay
+ARRAYCONNECTION_PREFIX = "arrayconnection:"
+
+
+def offset_to_cursor(offset, prefix=ARRAYCONNECTION_PREFIX) -> str:
+    """
+    returns the cursor of the edge at the given offset
+    """
+    return base64.b64encode(f"{prefix}{offset}".encode("utf-8")).decode("ascii")
+
+
+def cursor_to_offset(cursor, prefix=ARRAYCONNECTION_PREFIX):
+    """
+    returns the offset of an offset cursor, or None if the cursor isn't an offset cursor with the given prefix
+    """
+    if not isinstance(cursor, str):
+        return None
+
+    try:
+        text = base64.b64decode(cursor, validate=True).decode("utf-8")
+    except (binascii.Error, UnicodeDecodeError):
+        return None
+
+    if not text.startswith(prefix) or not text[len(prefix):].isdigit():
+        return None
+
+    return int(text[len(prefix):])
@@ -0,0 +1,151 @@
+# Copyright (c) 2020 UniversalAppFactory
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+import json
+from typing import Optional
+
+DATA_TOKEN = "data"
+ERRORS_TOKEN = "errors"
+
+
+class GraphQLResponseError(Exception):
+
+    def __init__(self, errors) -> None:
+        """Raised if a raw response contains errors
+
+        Keyword arguments:
+        errors -- the list of errors of the response
+        """
+        super(GraphQLResponseError, self).__init__(f"the response contains errors: {errors!r}")
+        self.errors = errors
+
+
+def _unwrap(response):
+    errors = response.get(ERRORS_TOKEN)
+    if errors:
+        raise GraphQLResponseError(errors)
+
+    return response.get(DATA_TOKEN)
+
+
+class JsonDecoder:
+    """
+    decodes raw responses by the json module of the standard library
+    """
+    name = "json"
+
+    def decode(self, raw, path=None) -> dict:
+        return _unwrap(json.loads(raw))
+
+
+class OrjsonDecoder:
+    """
+    decodes raw responses by orjson
+    """
+    name = "orjson"
+
+    def __init__(self) -> None:
+        import orjson
+        self._loads = orjson.loads
+
+    def decode(self, raw, path=None) -> dict:
+        return _unwrap(self._loads(raw))
+
+
+class MsgspecDecoder:
+    name = "msgspec"
+
+    def __init__(self, partial=False) -> None:
+        """Create a new instance which decodes raw responses by msgspec
+
+        Keyword arguments:
+        partial -- set this to true to decode only the pageInfo and the edges of the connection, all other fields are skipped
+        """
+        import msgspec
+        self._msgspec = msgspec
+        self._decoder = msgspec.json.Decoder()
+        self._partial = partial
+        self._typed_decoders = {}
+
+    def _typed_decoder(self, path):
+        decoder = self._typed_decoders.get(path)
+        if decoder is None:
+            msgspec = self._msgspec
+            level = msgspec.defstruct("Connection", [("pageInfo", dict), ("edges", list)])
+            for key in reversed(path):
+                # the response keys are renamed as they aren't necessarily valid attribute names
+                level = msgspec.defstruct("Level", [("value", Optional[level], None)], rename={"value": key})
+
+            response = msgspec.defstruct("Response", [(DATA_TOKEN, Optional[level], None), (ERRORS_TOKEN, Optional[list], None)])
+            decoder = msgspec.json.Decoder(response)
+            self._typed_decoders[path] = decoder
+
+        return decoder
+
+    def decode(self, raw, path=None) -> dict:
+        if not self._partial or path is None:
+            return _unwrap(self._decoder.decode(raw))
+
+        response = self._typed_decoder(tuple(path)).decode(raw)
+        if response.errors:
+            raise GraphQLResponseError(response.errors)
+
+        if response.data is None:
+            return None
+
+        data = {}
+        parent, level = data, response.data
+        for key in path[:-1]:
+            level = level.value
+            parent[key] = {} if level is not None else None
+            if level is None:
+                return data
+
+            parent = parent[key]
+
+        connection = level.value
+        parent[path[-1]] = {"pageInfo": connection.pageInfo, "edges": connection.edges} if connection is not None else None
+        return data
+
+
+# ordered by the decoding speed of whole responses, see benchmarks.decoders
+DECODERS = {
+    OrjsonDecoder.name: OrjsonDecoder,
+    MsgspecDecoder.name: MsgspecDecoder,
+    JsonDecoder.name: JsonDecoder,
+}
+
+
+def get_decoder(name=None):
+    """
+    returns the decoder with the given name, or the fastest installed decoder if no name is given
+    """
+    if name is not None:
+        if name not in DECODERS:
+            raise ValueError(f"unknown decoder {name!r}, available decoders are {', '.join(DECODERS)}")
+
+        return DECODERS[name]()
+
+    for decoder in DECODERS.values():
+        try:
+            return decoder()
+        except ImportError:
+            pass
+
+    return JsonDecoder()
@@ -0,0 +1,349 @@
+# Copyright (c) 2020 UniversalAppFactory
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+import asyncio
+import json
+from copy import deepcopy
+from graphql import DocumentNode, FieldNode, FragmentDefinitionNode, NameNode, OperationDefinitionNode, SelectionSetNode, VariableNode, Visitor, parse, print_ast, visit
+from .cache import query_text
+from .decoders import get_decoder
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class HttpExecutor:
+
+    def __init__(self, url, headers=None, limit=100, limit_per_host=0, timeout=30.0, keepalive_timeout=30.0, raw=False, decoder=None) -> None:
+        """Create a new executor which sends the queries by a single pooled aiohttp session
+
+        The session is created by the first request and can be shared by many GqlRelayResult and SubResult instances,
+        the connections are kept alive and reused by all of them.
+
+        Keyword arguments:
+        url -- the url of the GraphQL endpoint
+        headers -- headers which are sent with every request, e.g. for authorization
+        limit -- the maximum number of open connections
+        limit_per_host -- the maximum number of open connections to the same host, there is no limit if it's 0
+        timeout -- the timeout of a request in seconds
+        keepalive_timeout -- the time in seconds an idle connection is kept open
+        raw -- set this to true to return the raw response body, the GqlRelayResult decodes it by its own decoder then
+        decoder -- the decoder or the name of the decoder to decode the responses if raw is false
+        """
+        if aiohttp is None:
+            raise ImportError("HttpExecutor requires aiohttp, install it by 'pip install gql-relay-result[aiohttp]'")
+
+        self.url = url
+        self.headers = headers
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self.keepalive_timeout = keepalive_timeout
+        self.raw = raw
+        self._decoder = decoder if decoder is not None and not isinstance(decoder, str) else get_decoder(decoder)
+        self._session = None
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host, keepalive_timeout=self.keepalive_timeout)
+            self._session = aiohttp.ClientSession(connector=connector, headers=self.headers, timeout=aiohttp.ClientTimeout(total=self.timeout))
+
+        return self._session
+
+    async def __call__(self, query, params):
+        payload = {"query": query_text(query), "variables": params}
+        operation_name = getattr(query, "operation_name", None)
+        if operation_name is not None:
+            payload["operationName"] = operation_name
+
+        async with self._get_session().post(self.url, json=payload) as response:
+            response.raise_for_status()
+            body = await response.read()
+
+        if self.raw:
+            return body
+
+        return self._decoder.decode(body)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+
+class _RenameVariables(Visitor):
+
+    def __init__(self, suffix) -> None:
+        super(_RenameVariables, self).__init__()
+        self.suffix = suffix
+
+    def enter_variable(self, node, *args):
+        return VariableNode(name=NameNode(value=node.name.value + self.suffix))
+
+
+def _replace(node, **changes):
+    """
+    returns a copy of an AST node with the given attributes replaced, the nodes are frozen by newer graphql-core versions
+    """
+    attributes = {key: getattr(node, key, None) for key in node.keys}
+    attributes.update(changes)
+    return type(node)(**attributes)
+
+
+class _BatchDocument:
+    """
+    the parsed parts of a query which are needed to combine many requests of this query into one document
+    """
+
+    def __init__(self, query) -> None:
+        document = getattr(query, "document", query)
+        if isinstance(document, str):
+            document = parse(document)
+
+        self.fragments = [x for x in document.definitions if isinstance(x, FragmentDefinitionNode)]
+        operations = [x for x in document.definitions if isinstance(x, OperationDefinitionNode)]
+        self.operation = operations[0] if len(operations) == 1 else None
+        self.batchable = self.operation is not None \
+            and all(isinstance(x, FieldNode) for x in self.operation.selection_set.selections) \
+            and not any(_uses_variables(x) for x in self.fragments)
+
+    def combine(self, variables_list):
+        """
+        returns the combined document, its variables and for every request a dictionary which maps the aliases to the response keys
+        """
+        variable_definitions = []
+        selections = []
+        variables = {}
+        aliases = []
+        names = [x.variable.name.value for x in self.operation.variable_definitions or ()]
+        for index, params in enumerate(variables_list):
+            suffix = f"_{index}"
+            renamer = _RenameVariables(suffix)
+            variable_definitions += [visit(x, renamer) for x in self.operation.variable_definitions or ()]
+            variables.update({name + suffix: params[name] for name in names if name in params})
+
+            keys = {}
+            for field in self.operation.selection_set.selections:
+                field = visit(field, renamer)
+                key = (field.alias or field.name).value
+                alias = f"c{index}_{key}"
+                selections.append(_replace(field, alias=NameNode(value=alias)))
+                keys[alias] = key
+
+            aliases.append(keys)
+
+        operation = _replace(self.operation, variable_definitions=tuple(variable_definitions),
+                             selection_set=SelectionSetNode(selections=tuple(selections)))
+        document = DocumentNode(definitions=(operation, *self.fragments))
+        return document, variables, aliases
+
+
+class _FindVariables(Visitor):
+
+    def __init__(self) -> None:
+        super(_FindVariables, self).__init__()
+        self.found = False
+
+    def enter_variable(self, node, *args):
+        self.found = True
+
+
+def _uses_variables(node):
+    visitor = _FindVariables()
+    visit(node, visitor)
+    return visitor.found
+
+
+class BatchingExecutor:
+
+    def __init__(self, executor, window=0.005, max_batch=20) -> None:
+        """Create a new executor which combines concurrent requests of the same query into a single GraphQL document
+
+        Every request becomes an aliased field, e.g. c0_numericValues, c1_numericValues, with its own renamed variables,
+        and the combined response is split up again for every waiting request.
+
+        Keyword arguments:
+        executor -- the executor which executes the combined queries, it must return dictionaries
+        window -- the time in seconds requests are collected before they are sent
+        max_batch -- the maximum number of requests within a single document
+        """
+        self._executor = executor
+        self.window = window
+        self.max_batch = max_batch
+        self._documents = {}
+        self._pending = []
+        self._timer = None
+        self._tasks = set()
+        self.requests = 0
+        self.batches = 0
+
+    async def __call__(self, query, params):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((query, params, future))
+        self.requests += 1
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        pending, self._pending = self._pending, []
+        groups = {}
+        for request in pending:
+            groups.setdefault(query_text(request[0]), []).append(request)
+
+        for text, requests in groups.items():
+            # the tasks are referenced until they have finished so that they can't be garbage collected
+            task = asyncio.ensure_future(self._execute(text, requests))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def _document(self, text, query):
+        document = self._documents.get(text)
+        if document is None:
+            document = _BatchDocument(query)
+            self._documents[text] = document
+
+        return document
+
+    async def _execute_single(self, query, params, future):
+        try:
+            result = await self._executor(query, params)
+        except Exception as error:
+            if not future.done():
+                future.set_exception(error)
+            return
+
+        if not future.done():
+            future.set_result(result)
+
+    async def _execute(self, text, requests):
+        try:
+            await self._execute_batch(text, requests)
+        except asyncio.CancelledError:
+            for _, _, future in requests:
+                future.cancel()
+            raise
+        except Exception as error:
+            # every waiting request gets the error, e.g. of an unparsable query or of a response which can't be split up
+            for _, _, future in requests:
+                if not future.done():
+                    future.set_exception(error)
+
+    async def _execute_batch(self, text, requests):
+        query = requests[0][0]
+        document = self._document(text, query)
+        self.batches += 1
+        if len(requests) == 1 or not document.batchable:
+            await asyncio.gather(*[self._execute_single(*x) for x in requests])
+            return
+
+        combined, variables, aliases = document.combine([params for _, params, _ in requests])
+        if hasattr(query, "document"):
+            combined = type(query)(combined)
+        elif isinstance(query, str):
+            combined = print_ast(combined)
+
+        result = await self._executor(combined, variables)
+        if not isinstance(result, dict):
+            raise TypeError(f"the executor of a BatchingExecutor must return dictionaries, not {type(result).__name__}")
+
+        for (_, _, future), keys in zip(requests, aliases):
+            if not future.done():
+                future.set_result({key: result.get(alias) for alias, key in keys.items()})
+
+
+def _argument_key(value):
+    if isinstance(value, DocumentNode) or hasattr(value, "document"):
+        return query_text(value)
+
+    return value
+
+
+class SingleFlight:
+
+    def __init__(self, method, copy_results=True) -> None:
+        """Create a wrapper which shares a single call of an executor or a resolver between all concurrent calls with equal arguments
+
+        Keyword arguments:
+        method -- the async executor or resolver method, its arguments must be JSON serializable apart from the query
+        copy_results -- set this to false to return the same result object to all callers, by default the callers which didn't
+                        execute the call get a deep copy so that factory methods can't modify the result of another caller
+        """
+        self._method = method
+        self.copy_results = copy_results
+        self._in_flight = {}
+        self.calls = 0
+        self.executions = 0
+        self.collapsed = 0
+
+    def _key(self, args, kwargs):
+        return json.dumps([[_argument_key(x) for x in args], kwargs], sort_keys=True, default=repr)
+
+    async def __call__(self, *args, **kwargs):
+        self.calls += 1
+        key = self._key(args, kwargs)
+        flight = self._in_flight.get(key)
+        leader = flight is None
+        if leader:
+            # the call runs in its own task so that a cancelled caller doesn't cancel the call of the other callers
+            flight = _Flight(asyncio.ensure_future(self._method(*args, **kwargs)))
+            self._in_flight[key] = flight
+            flight.task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+            self.executions += 1
+        else:
+            self.collapsed += 1
+
+        flight.waiters += 1
+        try:
+            result = await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # nobody waits for the call anymore
+                flight.task.cancel()
+            raise
+
+        return deepcopy(result) if self.copy_results and not leader else result
+
+    def stats(self) -> dict:
+        return {"calls": self.calls, "executions": self.executions, "collapsed": self.collapsed}
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task) -> None:
+        self.task = task
+        self.waiters = 0
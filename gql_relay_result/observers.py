@@ -0,0 +1,257 @@
+# Copyright (c) 2020 UniversalAppFactory
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+import bisect
+import threading
+import time
+
+# upper bounds in seconds of the histogram buckets, the last bucket contains everything above
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RelayObserver:
+    """
+    base class for observers which are notified about the requests, the parsing and the factory calls of a result,
+    all methods do nothing so that only the needed ones have to be overridden
+    """
+
+    def on_request_start(self, query, params):
+        """
+        called before a page is requested, the return value is passed to on_request_end
+        """
+        return None
+
+    def on_request_end(self, context, seconds, error=None):
+        pass
+
+    def on_decode(self, seconds, size):
+        pass
+
+    def on_parse(self, seconds, items):
+        pass
+
+    def on_factory(self, seconds, items):
+        pass
+
+    def on_retry(self, attempt, error, delay):
+        pass
+
+    def on_error(self, error):
+        pass
+
+
+class CompositeObserver(RelayObserver):
+
+    def __init__(self, observers) -> None:
+        """Create a new observer which notifies all given observers
+
+        Keyword arguments:
+        observers -- a list of RelayObserver instances
+        """
+        self.observers = list(observers)
+
+    def on_request_start(self, query, params):
+        return [x.on_request_start(query, params) for x in self.observers]
+
+    def on_request_end(self, context, seconds, error=None):
+        for observer, x in zip(self.observers, context):
+            observer.on_request_end(x, seconds, error)
+
+    def on_decode(self, seconds, size):
+        for observer in self.observers:
+            observer.on_decode(seconds, size)
+
+    def on_parse(self, seconds, items):
+        for observer in self.observers:
+            observer.on_parse(seconds, items)
+
+    def on_factory(self, seconds, items):
+        for observer in self.observers:
+            observer.on_factory(seconds, items)
+
+    def on_retry(self, attempt, error, delay):
+        for observer in self.observers:
+            observer.on_retry(attempt, error, delay)
+
+    def on_error(self, error):
+        for observer in self.observers:
+            observer.on_error(error)
+
+
+class Histogram:
+
+    def __init__(self, buckets=DEFAULT_BUCKETS) -> None:
+        """Create a new histogram of durations
+
+        Keyword arguments:
+        buckets -- the sorted upper bounds of the buckets in seconds
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q):
+        """
+        returns the upper bound of the bucket which contains the given quantile, or the maximum for the last bucket
+        """
+        if self.count == 0:
+            return None
+
+        rank = q * self.count
+        total = 0
+        for index, count in enumerate(self.counts):
+            total += count
+            if total >= rank and count > 0:
+                return self.buckets[index] if index < len(self.buckets) else self.max
+
+        return self.max
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+class MetricsCollector(RelayObserver):
+
+    def __init__(self, buckets=DEFAULT_BUCKETS) -> None:
+        """Create a new observer which collects latency histograms and throughput counters, it can be shared by many results
+
+        Keyword arguments:
+        buckets -- the sorted upper bounds of the histogram buckets in seconds
+        """
+        self.request_latency = Histogram(buckets)
+        self.decode_latency = Histogram(buckets)
+        self.parse_latency = Histogram(buckets)
+        self.factory_latency = Histogram(buckets)
+        self.requests = 0
+        self.pages = 0
+        self.items = 0
+        self.created = 0
+        self.bytes = 0
+        self.retries = 0
+        self.errors = 0
+        self._started = None
+        self._lock = threading.Lock()
+
+    def on_request_start(self, query, params):
+        with self._lock:
+            if self._started is None:
+                self._started = time.perf_counter()
+
+    def on_request_end(self, context, seconds, error=None):
+        with self._lock:
+            self.requests += 1
+            self.request_latency.observe(seconds)
+
+    def on_decode(self, seconds, size):
+        with self._lock:
+            self.bytes += size
+            self.decode_latency.observe(seconds)
+
+    def on_parse(self, seconds, items):
+        with self._lock:
+            self.pages += 1
+            self.items += items
+            self.parse_latency.observe(seconds)
+
+    def on_factory(self, seconds, items):
+        with self._lock:
+            self.created += items
+            self.factory_latency.observe(seconds)
+
+    def on_retry(self, attempt, error, delay):
+        with self._lock:
+            self.retries += 1
+
+    def on_error(self, error):
+        with self._lock:
+            self.errors += 1
+
+    def snapshot(self) -> dict:
+        """
+        returns all counters and histograms, items_per_second is measured since the first request
+        """
+        with self._lock:
+            elapsed = time.perf_counter() - self._started if self._started is not None else 0.0
+            return {
+                "requests": self.requests,
+                "pages": self.pages,
+                "items": self.items,
+                "created": self.created,
+                "bytes": self.bytes,
+                "retries": self.retries,
+                "errors": self.errors,
+                "elapsed": elapsed,
+                "items_per_second": self.items / elapsed if elapsed > 0 else 0.0,
+                "request_latency": self.request_latency.snapshot(),
+                "decode_latency": self.decode_latency.snapshot(),
+                "parse_latency": self.parse_latency.snapshot(),
+                "factory_latency": self.factory_latency.snapshot(),
+            }
+
+
+class OpenTelemetryObserver(RelayObserver):
+
+    def __init__(self, tracer=None, span_name="graphql.page") -> None:
+        """Create a new observer which records a span for every page request, it needs opentelemetry-api
+
+        Keyword arguments:
+        tracer -- the tracer which creates the spans, by default the tracer of this module is used
+        span_name -- the name of the spans
+        """
+        try:
+            from opentelemetry import trace
+        except ImportError:
+            raise ImportError("OpenTelemetryObserver requires opentelemetry-api, install it by 'pip install gql-relay-result[opentelemetry]'")
+
+        self._trace = trace
+        self._tracer = tracer if tracer is not None else trace.get_tracer(__name__)
+        self.span_name = span_name
+
+    def on_request_start(self, query, params):
+        span = self._tracer.start_span(self.span_name)
+        for key, value in params.items():
+            if isinstance(value, (str, bool, int, float)):
+                span.set_attribute(f"graphql.variables.{key}", value)
+
+        return span
+
+    def on_request_end(self, context, seconds, error=None):
+        if error is not None:
+            context.record_exception(error)
+            context.set_status(self._trace.Status(self._trace.StatusCode.ERROR, str(error)))
+
+        context.end()
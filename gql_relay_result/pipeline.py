@@ -0,0 +1,246 @@
+# Copyright (c) 2020 UniversalAppFactory
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+import asyncio
+
+
+class _MapStage:
+
+    def __init__(self, method) -> None:
+        self.method = method
+        self.done = False
+
+    async def process(self, items):
+        method = self.method
+        return [method(x) for x in items]
+
+    def flush(self):
+        return []
+
+
+class _FilterStage(_MapStage):
+
+    async def process(self, items):
+        predicate = self.method
+        return [x for x in items if predicate(x)]
+
+
+class _MapConcurrentStage(_MapStage):
+
+    def __init__(self, method, limit) -> None:
+        super(_MapConcurrentStage, self).__init__(method)
+        self.limit = limit
+
+    async def process(self, items):
+        semaphore = asyncio.Semaphore(self.limit)
+
+        async def run(item):
+            async with semaphore:
+                return await self.method(item)
+
+        return await asyncio.gather(*[run(x) for x in items])
+
+
+class _BatchStage:
+
+    def __init__(self, size) -> None:
+        self.size = size
+        self.done = False
+        self._pending = []
+
+    async def process(self, items):
+        pending = self._pending + list(items)
+        count = len(pending) - len(pending) % self.size
+        self._pending = pending[count:]
+        return [pending[start:start + self.size] for start in range(0, count, self.size)]
+
+    def flush(self):
+        pending, self._pending = self._pending, []
+        return [pending] if pending else []
+
+
+class _TakeStage:
+
+    def __init__(self, count) -> None:
+        self.remaining = count
+        self.done = count <= 0
+
+    async def process(self, items):
+        items = items[:self.remaining]
+        self.remaining -= len(items)
+        self.done = self.remaining <= 0
+        return items
+
+    def flush(self):
+        return []
+
+
+class Pipeline:
+    """
+    a chain of operators which runs page by page over the items of a result, every operator processes the list of items
+    of a page at once so that there is no per item dispatch between the stages, the operators return a new pipeline
+    """
+
+    def __init__(self, source, stages=(), buffer=0) -> None:
+        self._source = source
+        # (stage class, arguments) tuples, the stages hold the state of a run so they are created for every run
+        self._stages = tuple(stages)
+        self._buffer = buffer
+
+    def _chain(self, stage_type, *args):
+        return Pipeline(self._source, self._stages + ((stage_type, args),), self._buffer)
+
+    def map(self, method):
+        """
+        applies a synchronous method to every item
+        """
+        return self._chain(_MapStage, method)
+
+    def filter(self, predicate):
+        """
+        keeps only the items for which the predicate returns true
+        """
+        return self._chain(_FilterStage, predicate)
+
+    def map_concurrent(self, method, limit=10):
+        """
+        applies an async method to the items of a page concurrently, limited by limit, the order of the items is preserved
+        """
+        return self._chain(_MapConcurrentStage, method, limit)
+
+    def batch(self, size):
+        """
+        groups the items into lists of size items, the last list can be smaller
+        """
+        return self._chain(_BatchStage, size)
+
+    def take(self, count):
+        """
+        stops after count items, no further pages are fetched then
+        """
+        return self._chain(_TakeStage, count)
+
+    def buffer(self, pages):
+        """
+        fetches the pages in a background task which stays at most the given number of pages ahead of the stages
+        """
+        return Pipeline(self._source, self._stages, pages)
+
+    async def _source_pages(self):
+        if self._buffer <= 0:
+            async for items, _ in self._source.pages():
+                yield items
+            return
+
+        queue = asyncio.Queue(maxsize=self._buffer)
+
+        async def produce():
+            # puts (items, error) tuples into the queue, items is None if all pages have been fetched
+            try:
+                async for items, _ in self._source.pages():
+                    await queue.put((items, None))
+                await queue.put((None, None))
+            except Exception as error:
+                await queue.put((None, error))
+
+        task = asyncio.ensure_future(produce())
+        try:
+            while True:
+                items, error = await queue.get()
+                if error is not None:
+                    raise error
+                if items is None:
+                    return
+
+                yield items
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    @staticmethod
+    async def _run(stages, items, start):
+        # runs the stages from start on and returns the resulting items and whether a stage is done
+        done = False
+        for stage in stages[start:]:
+            items = await stage.process(items)
+            done = done or stage.done
+
+        return items, done
+
+    @staticmethod
+    async def _flush(stages):
+        # passes the items which are still held by batch stages through the following stages
+        result = []
+        for index, stage in enumerate(stages):
+            items = stage.flush()
+            if items:
+                items, _ = await Pipeline._run(stages, items, index + 1)
+                result += items
+
+        return result
+
+    async def pages(self):
+        """
+        yields the resulting items page by page, batches and filtered pages can be empty lists
+        """
+        stages = [stage_type(*args) for stage_type, args in self._stages]
+        source = self._source_pages()
+        done = any(x.done for x in stages)
+        try:
+            while not done:
+                try:
+                    items = await source.__anext__()
+                except StopAsyncIteration:
+                    break
+
+                items, done = await Pipeline._run(stages, items, 0)
+                yield items
+
+            rest = await Pipeline._flush(stages)
+            if rest:
+                yield rest
+        finally:
+            await source.aclose()
+            aclose = getattr(self._source, "aclose", None)
+            if aclose is not None:
+                # cancels the pages which are still prefetched by the result, e.g. after take or if the consumer stopped early
+                await aclose()
+
+    def __aiter__(self):
+        return self._items()
+
+    async def _items(self):
+        pages = self.pages()
+        try:
+            async for items in pages:
+                for item in items:
+                    yield item
+        finally:
+            # async for doesn't close the pages if the consumer stops early
+            await pages.aclose()
+
+    async def collect(self) -> list:
+        """
+        returns all resulting items as a list
+        """
+        result = []
+        async for items in self.pages():
+            result += items
+
+        return result
@@ -17,15 +17,35 @@
 # LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
+import array
 import asyncio
-import traceback
+import inspect
+import json
+import random
+import threading
+import time
+from collections.abc import Mapping
+from gql.transport.exceptions import TransportQueryError
+from graphql import FieldNode, FragmentDefinitionNode, FragmentSpreadNode, GraphQLError, InlineFragmentNode, OperationDefinitionNode, parse
+from .cache import page_key, query_text
+from .cursors import ARRAYCONNECTION_PREFIX, cursor_to_offset, offset_to_cursor
+from .decoders import GraphQLResponseError, get_decoder
+from .pipeline import Pipeline
+from .sync import IncrementalSync, page_checksum
 PAGEINFO_TOKEN = "pageInfo"
 STARTCURSOR_TOKEN = "startCursor"
 ENDCURSOR_TOKEN = "endCursor"
 HASNEXTPAGE_TOKEN = "hasNextPage"
 HASPREVIOUSPAGE_TOKEN = "hasPreviousPage"
 EDGES_TOKEN = "edges"
+TOTALCOUNT_TOKEN = "totalCount"
+NODE_TOKEN = "node"
+CURSOR_TOKEN = "cursor"
 AFTER_PARAM = "after"
+FIRST_PARAM = "first"
+BEFORE_PARAM = "before"
+LAST_PARAM = "last"
+DEFAULT_FACTORY_CHUNK_SIZE = 100
 
 class PageInfo:
     
@@ -48,8 +68,157 @@ class PageInfo:
             return PageInfo.empty()
 
         keys = list(data.keys())
-        page_info = data[keys[0]][PAGEINFO_TOKEN]
-        return PageInfo(page_info[STARTCURSOR_TOKEN], page_info[ENDCURSOR_TOKEN], page_info[HASNEXTPAGE_TOKEN], page_info[HASPREVIOUSPAGE_TOKEN])                
+        return PageInfo.from_connection(data[keys[0]])
+
+    @staticmethod
+    def from_connection(connection):
+        if connection is None:
+            return PageInfo.empty()
+
+        page_info = connection[PAGEINFO_TOKEN]
+        return PageInfo(page_info[STARTCURSOR_TOKEN], page_info[ENDCURSOR_TOKEN], page_info[HASNEXTPAGE_TOKEN], page_info[HASPREVIOUSPAGE_TOKEN])
+
+
+class ConnectionPath:
+    """
+    the path of response keys from the root of a result to the connection which contains the pageInfo and the edges
+    """
+
+    @staticmethod
+    def parse(path) -> tuple:
+        """
+        returns the keys of a dotted path like "viewer.repos" or of a list of keys
+        """
+        if isinstance(path, str):
+            return tuple(path.split("."))
+
+        return tuple(path)
+
+    @staticmethod
+    def from_query(query):
+        """
+        returns the keys of the first field in the query which selects pageInfo and edges, or None if there is no such field
+        """
+        document = getattr(query, "document", query)
+        if isinstance(document, str):
+            try:
+                document = parse(document)
+            except GraphQLError:
+                return None
+
+        definitions = getattr(document, "definitions", None)
+        if definitions is None:
+            return None
+
+        fragments = {x.name.value: x for x in definitions if isinstance(x, FragmentDefinitionNode)}
+        operation = next((x for x in definitions if isinstance(x, OperationDefinitionNode)), None)
+        if operation is None:
+            return None
+
+        return ConnectionPath._find(operation.selection_set, fragments, ())
+
+    @staticmethod
+    def _fields(selection_set, fragments):
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                yield selection
+            elif isinstance(selection, InlineFragmentNode):
+                yield from ConnectionPath._fields(selection.selection_set, fragments)
+            elif isinstance(selection, FragmentSpreadNode) and selection.name.value in fragments:
+                yield from ConnectionPath._fields(fragments[selection.name.value].selection_set, fragments)
+
+    @staticmethod
+    def _find(selection_set, fragments, path):
+        for field in ConnectionPath._fields(selection_set, fragments):
+            if field.selection_set is None:
+                continue
+
+            key = path + ((field.alias or field.name).value,)
+            names = {x.name.value for x in ConnectionPath._fields(field.selection_set, fragments)}
+            if PAGEINFO_TOKEN in names and EDGES_TOKEN in names:
+                return key
+
+            found = ConnectionPath._find(field.selection_set, fragments, key)
+            if found is not None:
+                return found
+
+        return None
+
+    @staticmethod
+    def resolve(result, path):
+        """
+        returns the connection at the path or None if the path doesn't exist in the result
+        """
+        connection = result
+        for key in path:
+            if not isinstance(connection, dict) or key not in connection:
+                return None
+
+            connection = connection[key]
+
+        return connection
+
+    @staticmethod
+    def discover(result) -> tuple:
+        """
+        returns the path of a connection at the top level of the result
+        """
+        return (next(k for k in result.keys() if k != PAGEINFO_TOKEN),)                
+
+
+class CompactEdge(Mapping):
+    """
+    a read-only edge which only keeps the cursor and the values of the projected node fields,
+    the node dictionary is created when it's accessed by edge["node"]
+    """
+    __slots__ = ("_cursor", "_values")
+    _fields = ()
+    _positions = {}
+    _types = {}
+
+    def __init__(self, cursor, values) -> None:
+        self._cursor = cursor
+        self._values = values
+
+    @classmethod
+    def type_for(cls, fields):
+        fields = tuple(fields)
+        edge_type = cls._types.get(fields)
+        if edge_type is None:
+            positions = {field: index for index, field in enumerate(fields)}
+            edge_type = type("CompactEdge", (cls,), {"__slots__": (), "_fields": fields, "_positions": positions})
+            cls._types[fields] = edge_type
+
+        return edge_type
+
+    @classmethod
+    def from_edge(cls, edge):
+        node = edge.get(NODE_TOKEN) or {}
+        return cls(edge.get(CURSOR_TOKEN), tuple(node.get(field) for field in cls._fields))
+
+    def __getitem__(self, key):
+        if key == NODE_TOKEN:
+            return dict(zip(self._fields, self._values))
+        if key == CURSOR_TOKEN and self._cursor is not None:
+            return self._cursor
+
+        raise KeyError(key)
+
+    def __iter__(self):
+        yield NODE_TOKEN
+        if self._cursor is not None:
+            yield CURSOR_TOKEN
+
+    def __len__(self):
+        return 1 if self._cursor is None else 2
+
+    def __reduce__(self):
+        # the edge types are created at runtime, so the edges are pickled by their fields, e.g. for a process pool
+        return (_compact_edge, (self._fields, self._cursor, self._values))
+
+
+def _compact_edge(fields, cursor, values):
+    return CompactEdge.type_for(fields)(cursor, values)
 
 
 class DataFactory:
@@ -63,15 +232,254 @@ class DataFactory:
         else:
             return []
 
+    @staticmethod
+    def from_connection(connection) -> list:
+        return connection[EDGES_TOKEN] if connection is not None else []
+
     @staticmethod
     def from_list(items) -> list:
         return items if items is not None else []
 
+    @staticmethod
+    def compact(edges, fields) -> list:
+        edge_type = CompactEdge.type_for(fields)
+        return [edge_type.from_edge(x) for x in edges]
+
+class PageFetchError(Exception):
+
+    def __init__(self, end_cursor, error) -> None:
+        """Raised if a page could not be fetched
+
+        Keyword arguments:
+        end_cursor -- the end cursor of the last page which has been fetched successfully, you can use it to resume the iteration
+        error -- the error which caused the failure
+        """
+        super(PageFetchError, self).__init__(f"fetching the page after cursor {end_cursor!r} failed: {error!r}")
+        self.end_cursor = end_cursor
+        self.error = error
+
+
+
+def is_rejected_cursor(error) -> bool:
+    """
+    true if a page couldn't be fetched because the server answered with errors, e.g. for a cursor of a deleted edge,
+    but not for network errors or timeouts
+    """
+    return isinstance(error.__cause__, (GraphQLResponseError, TransportQueryError))
+
+
+class RetryPolicy:
+
+    def __init__(self, attempts=3, base_delay=0.5, max_delay=30.0, jitter=True, retry_on=(Exception,)) -> None:
+        """Create a new instance which retries failed requests with exponential backoff
+
+        Keyword arguments:
+        attempts -- the maximum number of attempts including the first one
+        base_delay -- the delay in seconds before the first retry, it is doubled for every further retry
+        max_delay -- the maximum delay in seconds
+        jitter -- set this to true to wait a random time between zero and the delay
+        retry_on -- a tuple of exception types which are retried
+        """
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.retry_on = retry_on
+
+    def delay(self, attempt):
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return random.uniform(0, delay) if self.jitter else delay
+
+    async def execute(self, method, observer=None):
+        """
+        awaits the coroutine returned by method until it succeeds or all attempts have failed,
+        the observer is notified about every retry
+        """
+        attempt = 1
+        while True:
+            try:
+                return await method()
+            except self.retry_on as error:
+                if attempt >= self.attempts:
+                    raise
+
+                delay = self.delay(attempt)
+                if observer is not None:
+                    observer.on_retry(attempt, error, delay)
+
+                await asyncio.sleep(delay)
+                attempt += 1
+
+
+class AdaptivePageSize:
+
+    def __init__(self, min_size, max_size, target_seconds=1.0, grow_factor=2.0, shrink_factor=0.5, param=FIRST_PARAM) -> None:
+        """Create a new instance which adjusts the page size between the pages
+
+        Keyword arguments:
+        min_size -- the minimum page size
+        max_size -- the maximum page size
+        target_seconds -- the page size grows while a page is fetched in less than half of this time and shrinks if it takes longer
+        grow_factor -- the page size is multiplied by this factor to grow
+        shrink_factor -- the page size is multiplied by this factor to shrink, also when fetching a page fails
+        param -- the name of the query variable which contains the page size
+        """
+        self.min_size = min_size
+        self.max_size = max_size
+        self.target_seconds = target_seconds
+        self.grow_factor = grow_factor
+        self.shrink_factor = shrink_factor
+        self.param = param
+        self.size = None
+        # contains a (page size, seconds, succeeded) tuple for every fetched page
+        self.history = []
+
+    def _clamp(self, size):
+        return max(self.min_size, min(self.max_size, int(size)))
+
+    def next_size(self, requested=None):
+        if self.size is None:
+            self.size = self._clamp(requested if requested is not None else self.min_size)
+
+        return self.size
+
+    def record(self, size, seconds, succeeded=True):
+        self.history.append((size, seconds, succeeded))
+        if not succeeded or seconds > self.target_seconds:
+            self.size = self._clamp(size * self.shrink_factor)
+        elif seconds < self.target_seconds / 2:
+            self.size = self._clamp(max(size * self.grow_factor, size + 1))
+        else:
+            self.size = self._clamp(size)
+
+
+class _BackgroundLoop:
+    """
+    a long-lived event loop running in a daemon thread, it is used to run async factory methods from synchronous code
+    so that not every item needs a new event loop
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="gql-relay-result", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def get(cls):
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = _BackgroundLoop()
+
+        return cls._instance
+
+    def run(self, coroutine):
+        if threading.current_thread() is self._thread:
+            coroutine.close()
+            raise RuntimeError("synchronous access is not possible from within an async factory method")
+
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+
+def _column_getter(field):
+    path = field.split(".")
+
+    def get(edge):
+        if isinstance(edge, CompactEdge) and len(path) == 1:
+            # the value is read by its position as a field can be named like a Mapping method, e.g. items
+            position = type(edge)._positions.get(path[0])
+            if position is not None:
+                return edge._values[position]
+
+        value = edge[NODE_TOKEN]
+        for key in path:
+            if value is None:
+                return None
+
+            value = value.get(key)
+
+        return value
+
+    return get
+
+
+class _ColumnBuffer:
+    """
+    a typed buffer which is preallocated and grows geometrically, it's either backed by a NumPy array or an array.array
+    """
+
+    def __init__(self, field, typecode, numpy, capacity) -> None:
+        self._field = field
+        self._typecode = typecode
+        self._numpy = numpy
+        self._size = 0
+        self._is_float = numpy.dtype(typecode).kind == "f" if numpy is not None else typecode in ("f", "d")
+        if numpy is not None:
+            self._data = numpy.empty(capacity, dtype=typecode)
+        else:
+            self._data = array.array(typecode, bytes(capacity * array.array(typecode).itemsize))
+
+    def _grow(self, needed):
+        capacity = max(needed, 2 * len(self._data))
+        if self._numpy is not None:
+            data = self._numpy.empty(capacity, dtype=self._typecode)
+            data[:self._size] = self._data[:self._size]
+            self._data = data
+        else:
+            self._data.extend(array.array(self._typecode, bytes((capacity - len(self._data)) * self._data.itemsize)))
+
+    def extend(self, values):
+        if self._is_float:
+            values = [float("nan") if x is None else x for x in values]
+        elif None in values:
+            raise ValueError(f"the field {self._field!r} contains null values which can't be stored with the typecode {self._typecode!r}, "
+                             "use a float typecode to get nan for null values")
+
+        end = self._size + len(values)
+        if end > len(self._data):
+            self._grow(end)
+
+        if self._numpy is not None:
+            self._data[self._size:end] = values
+        else:
+            self._data[self._size:end] = array.array(self._typecode, values)
+
+        self._size = end
+
+    def result(self):
+        if self._numpy is not None:
+            return self._data[:self._size].copy()
+
+        del self._data[self._size:]
+        return self._data
+
+
+def _create_chunk(factory, edges):
+    # runs within the factory executor, so it must be a module level function to be sent to a process pool
+    return [factory(x) for x in edges]
+
+
 class IterableResult:
-    
-    def __init__(self, result, factory=None, is_async_factory=False) -> None:
+    # these options are set by subclasses before the first page is parsed
+    _streaming = False
+    _fields = None
+    _connection_path = None
+    _query_connection_path = None
+    _observer = None
+    _factory_executor = None
+    _factory_chunk_size = DEFAULT_FACTORY_CHUNK_SIZE
+    # false until the first page has been fetched by a result which has been created without a first page
+    _fetched = True
+    # the factory time and the number of created items of the current page, reported to the observer per page
+    _factory_seconds = 0.0
+    _factory_items = 0
+
+    def __init__(self, result, factory=None, is_async_factory=False, concurrency=None, batch_factory=None) -> None:
         self._index = -1
         self._factory = factory
+        self._batch_factory = batch_factory
+        self._concurrency = concurrency
         self._parse_result(result)
         self._is_async_factory = is_async_factory
 
@@ -82,12 +490,24 @@ class IterableResult:
         return await self.next()
 
     def __getitem__(self, index):
+        if self._is_page_mode():
+            return self._create_page()[index]
+
         return self._create_item(index)
 
+    def _is_page_mode(self):
+        if self._batch_factory is not None:
+            return True
+
+        if self._factory_executor is not None and self._factory is not None:
+            return True
+
+        return self._concurrency is not None and self._is_async_factory and self._factory is not None
+
     def _create_item(self, index):
         if self._factory is not None:
             if self._is_async_factory:
-                return asyncio.run(self._factory(self._data[index]))
+                return _BackgroundLoop.get().run(self._factory(self._data[index]))
             
             return self._factory(self._data[index])
 
@@ -99,13 +519,122 @@ class IterableResult:
 
         return self._data[index]
 
+    def _set_factory_executor(self, factory_executor, factory_chunk_size):
+        if factory_executor is not None and self._is_async_factory:
+            raise ValueError("a factory executor can't run an async factory method")
+
+        self._factory_executor = factory_executor
+        if factory_chunk_size is not None:
+            self._factory_chunk_size = factory_chunk_size
+
+    def _chunks(self):
+        size = self._factory_chunk_size
+        return [self._data[start:start + size] for start in range(0, len(self._data), size)]
+
+    def _create_page(self):
+        if self._page_items is None:
+            if self._is_async_factory:
+                return _BackgroundLoop.get().run(self._create_page_async())
+
+            start = time.perf_counter() if self._observer is not None else None
+            if self._factory_executor is not None and self._batch_factory is None:
+                chunks = self._chunks()
+                created = self._factory_executor.map(_create_chunk, [self._factory] * len(chunks), chunks)
+                self._page_items = [x for chunk in created for x in chunk]
+            else:
+                self._page_items = list(self._batch_factory(self._data))
+
+            if start is not None:
+                self._observe_factory(start, len(self._page_items))
+
+        return self._page_items
+
+    async def _create_page_async(self):
+        # creates all items of the current page at once, either by the batch factory
+        # or by running the async factory concurrently limited by the given concurrency
+        # or by running the factory for chunks of the edges in the factory executor
+        if self._page_items is None:
+            start = time.perf_counter() if self._observer is not None else None
+            if self._factory_executor is not None and self._batch_factory is None:
+                loop = asyncio.get_running_loop()
+                chunks = await asyncio.gather(*[loop.run_in_executor(self._factory_executor, _create_chunk, self._factory, x) for x in self._chunks()])
+                self._page_items = [x for chunk in chunks for x in chunk]
+            elif self._batch_factory is not None:
+                items = self._batch_factory(self._data)
+                self._page_items = list(await items if self._is_async_factory else items)
+            else:
+                semaphore = asyncio.Semaphore(self._concurrency)
+
+                async def create(index):
+                    async with semaphore:
+                        return await self._create_item_async(index)
+
+                self._page_items = await asyncio.gather(*[create(index) for index in range(len(self._data))])
+
+            if start is not None:
+                self._observe_factory(start, len(self._page_items))
+
+        return self._page_items
+
+    def _observe_factory(self, start, items):
+        self._factory_seconds += time.perf_counter() - start
+        self._factory_items += items
+
+    def _report_factory(self):
+        if self._observer is not None and self._factory_items > 0:
+            self._observer.on_factory(self._factory_seconds, self._factory_items)
+
+        self._factory_seconds = 0.0
+        self._factory_items = 0
+
     def _parse_result(self, result):
-        self._pageInfo = PageInfo.create(result)
-        self._data = None if len(result) == 0 else DataFactory.from_result(result)
+        if self._observer is not None:
+            self._report_factory()
+            start = time.perf_counter()
+            self._parse_connection(result)
+            self._observer.on_parse(time.perf_counter() - start, len(self._data) if self._data is not None else 0)
+        else:
+            self._parse_connection(result)
+
+    def _parse_connection(self, result):
+        self._page_items = None
+        self._fetched = True
+        connection = self._connection(result)
+        self._pageInfo = PageInfo.from_connection(connection)
+        self._data = None if connection is None else self._edges(connection)
+        if self._data is not None and self._fields is None and self._streaming:
+            # released items must not modify the edges of the caller's result
+            self._data = list(self._data)
+
+    def _edges(self, connection):
+        # the edges of a page as they are kept by the result, i.e. compacted if fields are projected
+        edges = DataFactory.from_connection(connection)
+        if self._fields is not None:
+            return DataFactory.compact(edges, self._fields)
+
+        return edges
 
-    def _get_params(self):
+    def _connection(self, result):
+        # the path of the connection is resolved by the first page and used for all following pages
+        if len(result) == 0:
+            return None
+
+        if self._connection_path is None:
+            query_path = self._query_connection_path
+            if query_path is not None and ConnectionPath.resolve(result, query_path) is not None:
+                self._connection_path = query_path
+            else:
+                self._connection_path = ConnectionPath.discover(result)
+
+        connection = result
+        for key in self._connection_path:
+            connection = connection[key]
+
+        return connection
+
+    def _get_params(self, after=None):
         params = dict(self._params)
-        params[AFTER_PARAM] = self._pageInfo.end_cursor
+        params[AFTER_PARAM] = after if after is not None else self._pageInfo.end_cursor
         return params
 
     async def _fetch_next_chunk(self):
@@ -114,18 +643,32 @@ class IterableResult:
 
         try:
             result = await self._executor(self._query, params)
-            self._parse_result(result)
-        except Exception:
-            traceback.print_exc() 
-            raise StopAsyncIteration
+        except Exception as error:
+            raise PageFetchError(after, error) from error
+
+        self._parse_result(result)
 
     async def next(self):
         self._index += 1
         if (self._index < len(self._data)):
-            if self._is_async_factory:
-                return await self._create_item_async(self._index)
+            if self._is_page_mode():
+                # the factory time of a page is observed when the page is created
+                items = await self._create_page_async()
+                item = items[self._index]
+            else:
+                start = time.perf_counter() if self._observer is not None else None
+                if self._is_async_factory:
+                    item = await self._create_item_async(self._index)
+                else:
+                    item = self._create_item(self._index)
+
+                if start is not None:
+                    self._observe_factory(start, 1)
+
+            if self._streaming:
+                self._release_item(self._index)
 
-            return self._create_item(self._index)         
+            return item
         
         if self._pageInfo.has_next:
             self._index = -1
@@ -134,8 +677,150 @@ class IterableResult:
             return await self.next()
         
         self._index = -1
+        self._on_exhausted()
         raise StopAsyncIteration
 
+    def _on_exhausted(self):
+        self._report_factory()
+
+    def _release_item(self, index):
+        # drops the references to consumed items so that they can be freed while the page is still iterated
+        self._data[index] = None
+        if self._page_items is not None:
+            self._page_items[index] = None
+
+    """
+    returns all items from current page while the items are created by a synchronous factory method
+    """
+    def all_from_current_page(self) -> list:
+        if self._is_async_factory and self._factory is not None and not self._is_page_mode():
+            return _BackgroundLoop.get().run(self.all_from_current_page_async())
+
+        if self._is_page_mode():
+            return list(self._create_page())
+
+        start = time.perf_counter() if self._observer is not None else None
+        result = []
+        for index in range(len(self._data)):
+            result.append(self._create_item(index))
+
+        if start is not None:
+            self._observe_factory(start, len(result))
+
+        return result
+
+    """
+    returns all items from current page while the items are created by a async factory method
+    """
+    async def all_from_current_page_async(self) -> list:
+        if self._is_page_mode():
+            return list(await self._create_page_async())
+
+        start = time.perf_counter() if self._observer is not None else None
+        result = []
+        for index in range(len(self._data)):
+            item = await self._create_item_async(index)
+            result.append(item)
+
+        if start is not None:
+            self._observe_factory(start, len(result))
+
+        return result
+
+    async def _raw_pages(self):
+        # yields the raw edges of every page
+        while True:
+            if self._data is not None and self._fetched:
+                yield self._data
+
+            if not self._pageInfo.has_next:
+                self._on_exhausted()
+                return
+
+            self._index = -1
+            await self._fetch_next_chunk()
+
+    async def pages(self):
+        """
+        yields a tuple of all items from a page and its PageInfo for every page, the following pages are fetched when needed
+        """
+        async for _ in self._raw_pages():
+            if self._is_async_factory:
+                items = await self.all_from_current_page_async()
+            else:
+                items = self.all_from_current_page()
+
+            yield items, self._pageInfo
+
+    def map(self, method) -> Pipeline:
+        """
+        returns a pipeline which applies the method to every item, see Pipeline
+        """
+        return Pipeline(self).map(method)
+
+    def filter(self, predicate) -> Pipeline:
+        """
+        returns a pipeline which keeps only the items for which the predicate returns true
+        """
+        return Pipeline(self).filter(predicate)
+
+    def map_concurrent(self, method, limit=10) -> Pipeline:
+        """
+        returns a pipeline which applies the async method to the items of every page, at most limit calls run at once
+        """
+        return Pipeline(self).map_concurrent(method, limit)
+
+    def batch(self, size) -> Pipeline:
+        """
+        returns a pipeline which groups the items into lists of size items independent of the pages
+        """
+        return Pipeline(self).batch(size)
+
+    def take(self, count) -> Pipeline:
+        """
+        returns a pipeline which stops after count items without fetching further pages
+        """
+        return Pipeline(self).take(count)
+
+    async def to_columns(self, fields, typecodes=None, use_numpy=None) -> dict:
+        """Collect node fields of all pages into typed arrays, the factory method isn't used
+
+        Returns a dictionary with a NumPy array for every field or an array.array if NumPy isn't installed.
+
+        Keyword arguments:
+        fields -- a list of node fields, nested fields are separated by dots, e.g. "stats.count"
+        typecodes -- a dictionary with array typecodes for the fields, the default typecode is "d" (float)
+        use_numpy -- set this to false to get array.array instances even if NumPy is installed
+        """
+        numpy = None
+        if use_numpy is not False:
+            try:
+                import numpy
+            except ImportError:
+                if use_numpy:
+                    raise
+
+        typecodes = typecodes or {}
+        getters = [_column_getter(field) for field in fields]
+        buffers = None
+        async for edges in self._raw_pages():
+            if buffers is None:
+                buffers = [_ColumnBuffer(field, typecodes.get(field, "d"), numpy, len(edges)) for field in fields]
+
+            for getter, buffer in zip(getters, buffers):
+                buffer.extend([getter(edge) for edge in edges])
+
+        if buffers is None:
+            buffers = [_ColumnBuffer(field, typecodes.get(field, "d"), numpy, 0) for field in fields]
+
+        return {field: buffer.result() for field, buffer in zip(fields, buffers)}
+
+    def materialize(self) -> list:
+        """
+        returns all items of all pages from synchronous code, the whole traversal runs on a single background event loop
+        """
+        return _BackgroundLoop.get().run(IterableResult.fetch_all(self))
+
     @staticmethod
     async def fetch_all(iterable) -> list:
         result = []
@@ -144,51 +829,582 @@ class IterableResult:
 
         return result
 
+    @staticmethod
+    async def fetch_into(iterable, sink, serializer=json.dumps) -> int:
+        """
+        passes every item to the sink as soon as it is created instead of collecting all items and returns the number of items
+        the sink is either a (async) method which is called for every item or a file-like object, every item is written
+        to a file-like object as a line created by the serializer
+        """
+        count = 0
+        write = getattr(sink, "write", None)
+        async for x in iterable:
+            if write is not None:
+                write(serializer(x) + "\n")
+            else:
+                result = sink(x)
+                if inspect.isawaitable(result):
+                    await result
+
+            count += 1
+
+        return count
+
 
 class GqlRelayResult(IterableResult):
 
-    def __init__(self, result, query, params, executor, factory=None, is_async_factory=False) -> None:
-        super(GqlRelayResult, self).__init__(result, factory, is_async_factory)
+    def __init__(self, result, query, params, executor, factory=None, is_async_factory=False, prefetch=0, concurrency=None, batch_factory=None, page_size=None, retry=None, cache=None, streaming=False, fields=None, connection_path=None, decoder=None, observer=None, scheduler=None, factory_executor=None, factory_chunk_size=None) -> None:
+        """Create a new instance
+
+        Keyword arguments:
+        result -- contains the raw result of the first page
+        query -- the query which is passed to the executor to fetch the following pages
+        params -- the query variables, the 'after' variable is replaced by the 'endCursor' of the previous page
+        executor -- an async method which executes the query, e.g. 'client.execute_async'
+        factory -- a factory method to create objects from the raw result
+        is_async_factory -- set this to true if the factory method is async
+        prefetch -- number of following pages which are fetched in the background while the current page is consumed
+        concurrency -- if set the async factory method is executed concurrently for all items of a page, limited by this number
+        batch_factory -- a factory method which creates all objects of a page at once from the list of raw edges
+        page_size -- an AdaptivePageSize instance to adjust the page size of the following pages by the time it takes to fetch them
+        retry -- a RetryPolicy to retry failed page requests
+        cache -- a PageCache to store the fetched pages, e.g. a MemoryPageCache or a SqlitePageCache
+        streaming -- set this to true to release every item as soon as it has been returned by the iteration, so that at most prefetch + 1 pages are kept in memory
+        fields -- a list of node fields, if set only these fields are kept in compact edges instead of the raw result dictionaries
+        connection_path -- the dotted path of the connection within the result, e.g. "viewer.repos", by default it's taken from the query
+        decoder -- the decoder or the name of the decoder ("json", "orjson" or "msgspec") for executors which return the raw response, by default the fastest installed decoder is used
+        observer -- a RelayObserver which is notified about the requests, the parsing and the factory calls, e.g. a MetricsCollector
+        scheduler -- a RequestScheduler, or a handle of it with a priority, which is shared by many results to stay within the rate limits
+        factory_executor -- a concurrent.futures executor, e.g. a ProcessPoolExecutor, which runs the synchronous factory method for chunks of the edges of a page
+        factory_chunk_size -- the number of edges which are sent to the factory executor at once
+        """
+        self._observer = observer
+        self._scheduler = scheduler
+        self._streaming = streaming
+        self._fields = fields
+        if connection_path is not None:
+            self._connection_path = ConnectionPath.parse(connection_path)
+        else:
+            self._query_connection_path = ConnectionPath.from_query(query)
+        super(GqlRelayResult, self).__init__(result, factory, is_async_factory, concurrency, batch_factory)
+        self._set_factory_executor(factory_executor, factory_chunk_size)
         self._query = query
         self._params = params
         self._executor = executor
+        self._page_size = page_size
+        self._retry = retry
+        self._cache = cache
+        self._query_text = None
+        self._decoder = decoder
+        self._prefetch = prefetch
+        self._prefetch_task = None
+        self._prefetch_queue = None
+        self._prefetch_slots = None
+        self._sync = None
 
-    async def _fetch_next_chunk(self):
-        after = self._pageInfo.end_cursor
-        params = self._get_params()
+    @classmethod
+    def from_query(cls, query, params, executor, factory=None, is_async_factory=False, after=None, **kwargs):
+        """
+        creates an instance without a first page, the first page is fetched when the iteration starts
+        if after is set, e.g. to the end_cursor of a PageFetchError, the iteration resumes after this cursor
+        """
+        result = cls({}, query, params, executor, factory, is_async_factory, **kwargs)
+        result._data = []
+        result._fetched = False
+        result._pageInfo = PageInfo(None, after if after is not None else params.get(AFTER_PARAM), True, False)
+        return result
+
+    @classmethod
+    async def incremental(cls, query, params, executor, store, key=None, factory=None, is_async_factory=False, checksum=False, is_invalid_cursor=is_rejected_cursor, **kwargs):
+        """Create an instance which yields only the edges added since the last run
+
+        The end cursor of the last page is saved to the store when the iteration has finished, the next run starts paging
+        after this cursor. If the saved cursor is rejected by the server, or the checksum of the first page has changed,
+        the whole connection is scanned again.
+
+        Keyword arguments:
+        query -- the query which is passed to the executor to fetch the pages
+        params -- the query variables
+        executor -- an async method which executes the query
+        store -- a SyncStateStore, e.g. a MemoryStateStore or a JsonFileStateStore
+        key -- the key of the state in the store, by default it's built from the query and the variables
+        factory -- a factory method to create objects from the raw result
+        is_async_factory -- set this to true if the factory method is async
+        checksum -- set this to true to verify the first page by its checksum, this costs an additional request
+        is_invalid_cursor -- a method which tells by a PageFetchError whether the saved cursor has been rejected, other errors are raised,
+                             by default only error responses of the server reject the cursor
+        """
+        if key is None:
+            key = page_key(query_text(query), params, AFTER_PARAM)
+
+        sync = IncrementalSync(store, key, checksum, is_invalid_cursor)
+        result = cls.from_query(query, params, executor, factory, is_async_factory, after=sync.end_cursor, **kwargs)
+        result._sync = sync
+        if checksum and sync.resuming:
+            first_params = dict(params)
+            first_params[AFTER_PARAM] = None
+            first = await result._fetch_page(None, first_params)
+            connection = result._connection(first)
+            current = page_checksum(result._edges(connection) if connection is not None else [])
+            if sync.checksum is not None and current != sync.checksum:
+                # the first page has changed, e.g. by deleted or reordered edges, so the saved cursor can't be trusted
+                sync.invalidate()
+                result._parse_result(first)
+                sync.page_fetched(result._pageInfo, result._data, False)
+
+            sync.checksum = current
+
+        return result
+
+    @property
+    def full_scan(self):
+        """
+        false if an incremental result pages only through the edges which have been added since the last run
+        """
+        return self._sync is None or self._sync.full_scan
 
+    def _page_key(self, params):
+        if self._query_text is None:
+            self._query_text = query_text(self._query)
+
+        return page_key(self._query_text, params, AFTER_PARAM)
+
+    async def _execute_page(self, after, params=None):
+        size = None
+        if params is None:
+            params = self._get_params(after)
+            if self._page_size is not None:
+                size = self._page_size.next_size(params.get(self._page_size.param))
+                params[self._page_size.param] = size
+
+        key = None
+        if self._cache is not None:
+            key = self._page_key(params)
+            result = self._cache.get(key)
+            if result is not None:
+                return result
+
+        if self._scheduler is not None:
+            await self._scheduler.acquire(self._scheduler.estimate(params))
+
+        context = self._observer.on_request_start(self._query, params) if self._observer is not None else None
+        start = time.perf_counter()
         try:
             result = await self._executor(self._query, params)
-            self._parse_result(result)
-        except Exception:
-            traceback.print_exc()
-            raise StopAsyncIteration
+        except Exception as error:
+            seconds = time.perf_counter() - start
+            if size is not None:
+                self._page_size.record(size, seconds, False)
+            if self._observer is not None:
+                self._observer.on_request_end(context, seconds, error)
+            raise
+
+        seconds = time.perf_counter() - start
+        if size is not None:
+            self._page_size.record(size, seconds)
+        if self._observer is not None:
+            self._observer.on_request_end(context, seconds)
+
+        if isinstance(result, (bytes, bytearray, memoryview, str)):
+            start = time.perf_counter()
+            size = len(result)
+            result = self._decode(result)
+            if self._observer is not None:
+                self._observer.on_decode(time.perf_counter() - start, size)
+
+        if self._scheduler is not None:
+            self._scheduler.record(result)
+
+        if key is not None:
+            self._cache.set(key, result)
 
-    """
-    returns all items from current page while the items are created by a synchronous factory method
-    """
-    def all_from_current_page(self) -> list:
-        result = []
-        for index in range(len(self._data)):
-            result.append(self._create_item(index))
-        
         return result
 
+    def _decode(self, raw):
+        if self._decoder is None or isinstance(self._decoder, str):
+            self._decoder = get_decoder(self._decoder)
+
+        path = self._connection_path if self._connection_path is not None else self._query_connection_path
+        return self._decoder.decode(raw, path)
+
+    async def _fetch_page(self, after, params=None):
+        try:
+            if self._retry is None:
+                return await self._execute_page(after, params)
+
+            return await self._retry.execute(lambda: self._execute_page(after, params), self._observer)
+        except Exception as error:
+            if self._observer is not None:
+                self._observer.on_error(error)
+            raise PageFetchError(after, error) from error
+
+    def _start_prefetch(self):
+        if self._prefetch <= 0 or self._prefetch_task is not None or not self._pageInfo.has_next:
+            return
+
+        self._prefetch_queue = asyncio.Queue()
+        self._prefetch_slots = asyncio.Semaphore(self._prefetch)
+        self._prefetch_task = asyncio.ensure_future(self._prefetch_pages(self._pageInfo.end_cursor))
+
+    async def _prefetch_pages(self, after):
+        # every slot is a page which is either in flight or fetched but not consumed yet
+        while True:
+            await self._prefetch_slots.acquire()
+            try:
+                result = await self._fetch_page(after)
+            except PageFetchError as error:
+                self._prefetch_queue.put_nowait((None, error))
+                return
+
+            self._prefetch_queue.put_nowait((result, None))
+            page_info = PageInfo.from_connection(self._connection(result))
+            if not page_info.has_next:
+                return
+
+            after = page_info.end_cursor
+
+    async def _next_prefetched_page(self):
+        while True:
+            self._start_prefetch()
+            queue = self._prefetch_queue
+            result, error = await queue.get()
+            if queue is self._prefetch_queue:
+                break
+
+            # prefetching has been stopped by aclose while waiting, it's started again after the current end cursor
+
+        self._prefetch_slots.release()
+        if error is not None:
+            # the prefetch task has stopped, the next call starts it again after the current end cursor
+            self._prefetch_task = None
+            self._prefetch_queue = None
+            self._prefetch_slots = None
+            raise error
+
+        return result
+
+    async def _fetch_next_chunk(self):
+        first_page = self._pageInfo.end_cursor is None
+        try:
+            if self._prefetch > 0:
+                result = await self._next_prefetched_page()
+            else:
+                result = await self._fetch_page(self._pageInfo.end_cursor)
+        except PageFetchError as error:
+            if self._sync is None or not self._sync.resuming or not self._sync.is_invalid_cursor(error):
+                raise
+
+            # the saved cursor has been rejected, e.g. because its edge has been deleted, so the connection is scanned from the start
+            self._sync.invalidate()
+            await self.aclose()
+            self._pageInfo = PageInfo(None, None, True, False)
+            return await self._fetch_next_chunk()
+
+        self._parse_result(result)
+        if self._sync is not None:
+            self._sync.page_fetched(self._pageInfo, self._data, first_page)
+
+    def _on_exhausted(self):
+        super(GqlRelayResult, self)._on_exhausted()
+        if self._sync is not None:
+            self._sync.save()
+
+    async def next(self):
+        self._start_prefetch()
+        return await super(GqlRelayResult, self).next()
+
+    async def aclose(self):
+        """
+        cancels pages which are still prefetched in the background, the iteration can be continued afterwards
+        """
+        task, queue = self._prefetch_task, self._prefetch_queue
+        self._prefetch_task = None
+        self._prefetch_queue = None
+        self._prefetch_slots = None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+        if queue is not None:
+            # wakes up a consumer which is still waiting for the next prefetched page
+            queue.put_nowait((None, None))
+
+    @staticmethod
+    async def fan_out(requests, executor, concurrency=4, factory=None, is_async_factory=False, grouped=False):
+        """Page through many queries concurrently
+
+        Yields a tuple of the index of the request and an item as soon as a page arrives, or if grouped is set
+        a tuple of the index of the request and all its items as soon as the request has been paged through.
+
+        Keyword arguments:
+        requests -- a list of (query, params) tuples
+        executor -- an async method which executes the queries
+        concurrency -- the maximum number of page requests which are executed at the same time
+        factory -- a factory method to create objects from the raw result
+        is_async_factory -- set this to true if the factory method is async
+        grouped -- set this to true to get all items of a request at once
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        queue = asyncio.Queue(maxsize=concurrency)
+
+        async def limited_executor(query, params):
+            async with semaphore:
+                return await executor(query, params)
+
+        async def drain(index, query, params):
+            # puts (index, items, error) tuples into the queue, items is None if the request is finished
+            result = GqlRelayResult.from_query(query, params, limited_executor, factory, is_async_factory)
+            try:
+                collected = []
+                async for items, _ in result.pages():
+                    if grouped:
+                        collected += items
+                    else:
+                        await queue.put((index, items, None))
+
+                if grouped:
+                    await queue.put((index, collected, None))
+
+                await queue.put((index, None, None))
+            except Exception as error:
+                await queue.put((index, None, error))
+
+        tasks = [asyncio.ensure_future(drain(index, query, params)) for index, (query, params) in enumerate(requests)]
+        try:
+            remaining = len(tasks)
+            while remaining > 0:
+                index, items, error = await queue.get()
+                if error is not None:
+                    raise error
+
+                if items is None:
+                    remaining -= 1
+                elif grouped:
+                    yield index, items
+                else:
+                    for item in items:
+                        yield index, item
+        finally:
+            for task in tasks:
+                task.cancel()
+
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    @staticmethod
+    async def segmented_scan(query, params, executor, segments=4, total=None, ordered=True, factory=None, is_async_factory=False, cursor_prefix=ARRAYCONNECTION_PREFIX, segment_buffer=2, **kwargs):
+        """Page through a connection with offset cursors by many concurrent segments
+
+        The first page is fetched as usual, then the remaining edges are split into segments which start at synthesized
+        'after' cursors and are paged through concurrently. If the cursors aren't offset cursors or the total count is unknown
+        the connection is paged through one page after the other.
+
+        Every segment keeps at most segment_buffer pages which haven't been yielded yet. In ordered mode the later segments
+        therefore wait until the earlier segments have been yielded, which trades some parallelism for bounded memory.
+
+        Keyword arguments:
+        query -- the query which is passed to the executor to fetch the pages
+        params -- the query variables
+        executor -- an async method which executes the query
+        segments -- the number of segments which are paged through concurrently
+        total -- the number of edges of the connection, by default the 'totalCount' field of the connection is used
+        ordered -- set this to false to yield the items of all segments as soon as their pages arrive instead of in the order of the connection
+        factory -- a factory method to create objects from the raw result
+        is_async_factory -- set this to true if the factory method is async
+        cursor_prefix -- the prefix of the offset within the decoded cursors
+        segment_buffer -- the maximum number of fetched pages per segment which haven't been yielded yet
+        """
+        first = GqlRelayResult.from_query(query, params, executor, factory, is_async_factory, **kwargs)
+        raw = await first._fetch_page(first._pageInfo.end_cursor)
+        first._parse_result(raw)
+        connection = first._connection(raw)
+        if total is None and isinstance(connection, dict):
+            total = connection.get(TOTALCOUNT_TOKEN)
+
+        last_offset = cursor_to_offset(first._pageInfo.end_cursor, cursor_prefix)
+        if total is None or last_offset is None or segments < 2 or not first._pageInfo.has_next:
+            async for items, _ in first.pages():
+                for item in items:
+                    yield item
+            return
+
+        for item in await first.all_from_current_page_async() if is_async_factory else first.all_from_current_page():
+            yield item
+
+        begin = last_offset + 1
+        size = max(-(-(total - begin) // segments), 1)
+        bounds = [(start, min(start + size, total)) for start in range(begin, total, size)]
+        if ordered:
+            queues = [asyncio.Queue(maxsize=segment_buffer) for _ in bounds]
+        else:
+            queues = [asyncio.Queue(maxsize=segment_buffer * len(bounds))] * len(bounds)
+
+        async def scan(index, start, end):
+            # puts (index, items, error) tuples into the queue of the segment, items is None if the segment is finished
+            segment_params = dict(params)
+            segment_params[AFTER_PARAM] = offset_to_cursor(start - 1, cursor_prefix)
+            result = GqlRelayResult.from_query(query, segment_params, executor, factory, is_async_factory, **kwargs)
+            remaining = end - start
+            try:
+                async for items, _ in result.pages():
+                    # the last page of a segment can overlap the following segment
+                    items = items[:remaining]
+                    remaining -= len(items)
+                    await queues[index].put((index, items, None))
+                    if remaining <= 0:
+                        break
+
+                await queues[index].put((index, None, None))
+            except Exception as error:
+                await queues[index].put((index, None, error))
+            finally:
+                await result.aclose()
+
+        tasks = [asyncio.ensure_future(scan(index, start, end)) for index, (start, end) in enumerate(bounds)]
+        try:
+            pending = len(tasks)
+            current = 0
+            while pending > 0:
+                _, items, error = await queues[current].get()
+                if error is not None:
+                    raise error
+
+                if items is None:
+                    pending -= 1
+                    current += 1 if ordered else 0
+                else:
+                    for item in items:
+                        yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class SeekableRelayResult(GqlRelayResult):
     """
-    returns all items from current page while the items are created by a async factory method
+    a GqlRelayResult which records the 'after' cursor of every visited page, so that any visited page can be fetched again
+    by a single request, and which can page backwards by the 'last' and 'before' variables
     """
-    async def all_from_current_page_async(self) -> list:
-        result = []
-        for index in range(len(self._data)):
-            item = await self._create_item_async(index)
-            result.append(item)
-        
+
+    def __init__(self, result, query, params, executor, factory=None, is_async_factory=False, **kwargs) -> None:
+        super(SeekableRelayResult, self).__init__(result, query, params, executor, factory, is_async_factory, **kwargs)
+        # the 'after' cursor of every visited page by its page number
+        self._page_cursors = [params.get(AFTER_PARAM)]
+        self._page_number = 0
+
+    @classmethod
+    def from_query(cls, query, params, executor, factory=None, is_async_factory=False, after=None, **kwargs):
+        result = super(SeekableRelayResult, cls).from_query(query, params, executor, factory, is_async_factory, after, **kwargs)
+        result._page_cursors = [result._pageInfo.end_cursor]
+        result._page_number = -1
         return result
 
+    @property
+    def page_number(self):
+        """
+        the number of the current page starting with 0, it's None while paging backwards
+        """
+        return self._page_number
+
+    @property
+    def known_pages(self):
+        """
+        the number of pages which can be fetched by a single request
+        """
+        return len(self._page_cursors)
+
+    async def _fetch_next_chunk(self):
+        after = self._pageInfo.end_cursor
+        await super(SeekableRelayResult, self)._fetch_next_chunk()
+        if self._page_number is None:
+            return
+
+        self._page_number += 1
+        if self._page_number == len(self._page_cursors):
+            self._page_cursors.append(after)
+
+    async def seek(self, page):
+        """
+        positions the iteration at the start of the given page, a visited page is fetched by a single request with its
+        stored cursor, otherwise the result pages forward from the last visited page
+        """
+        if page < 0:
+            raise IndexError(f"invalid page number {page}")
+
+        await self.aclose()
+        if page != self._page_number or self._data is None:
+            # positions the result right before the nearest visited page
+            start = min(page, len(self._page_cursors) - 1)
+            self._pageInfo = PageInfo(None, self._page_cursors[start], True, False)
+            self._page_number = start - 1
+            while self._page_number < page:
+                if not self._pageInfo.has_next:
+                    raise IndexError(f"the result has only {self._page_number + 1} pages")
+
+                await self._fetch_next_chunk()
+
+        self._index = -1
+
+    def _get_backward_params(self, before, size):
+        params = {k: v for k, v in self._params.items() if k not in (FIRST_PARAM, AFTER_PARAM)}
+        params[LAST_PARAM] = size
+        params[BEFORE_PARAM] = before
+        return params
+
+    async def pages_backward(self, size=None):
+        """Yield a tuple of all items from a page and its PageInfo for every page, starting with the last page of the connection
+
+        The items within a page keep the order of the connection. If a page has been loaded already the result pages backwards
+        from this page instead. The query must declare the 'last' and 'before' variables.
+
+        Keyword arguments:
+        size -- the number of edges per page, by default the 'last' or 'first' variable is used
+        """
+        if size is None:
+            size = self._params.get(LAST_PARAM, self._params.get(FIRST_PARAM))
+
+        await self.aclose()
+        before = self._pageInfo.start_cursor if self._data else None
+        self._page_number = None
+        while True:
+            self._parse_result(await self._fetch_page(before, self._get_backward_params(before, size)))
+            self._index = -1
+            if self._is_async_factory:
+                items = await self.all_from_current_page_async()
+            else:
+                items = self.all_from_current_page()
+
+            yield items, self._pageInfo
+            if not self._pageInfo.has_prev or not self._data:
+                return
+
+            before = self._pageInfo.start_cursor
+
+    @classmethod
+    async def tail(cls, query, params, executor, count, factory=None, is_async_factory=False, **kwargs) -> list:
+        """
+        returns the last count items of the connection in the order of the connection, fetched by backward paging
+        """
+        result = cls.from_query(query, params, executor, factory, is_async_factory, **kwargs)
+        pages = []
+        collected = 0
+        async for items, _ in result.pages_backward(min(count, params.get(LAST_PARAM, count))):
+            pages.append(items)
+            collected += len(items)
+            if collected >= count:
+                break
+
+        items = [x for page in reversed(pages) for x in page]
+        return items[max(len(items) - count, 0):]
+
 
 class SubResult(IterableResult):
         
-    def __init__(self, result, resolver, params, factory=None, is_async_factory=False, resolver_returns_complete_objects=False) -> None:
+    def __init__(self, result, resolver, params, factory=None, is_async_factory=False, resolver_returns_complete_objects=False, concurrency=None, batch_factory=None, retry=None, observer=None, scheduler=None, factory_executor=None, factory_chunk_size=None) -> None:
         """Create a new instance
 
         Keyword arguments:
@@ -198,39 +1414,145 @@ class SubResult(IterableResult):
         factory -- a factory method to create objects from the raw result
         is_async_factory -- set this to true if the factory method is async
         resolver_returns_complete_objects -- if the resolver already returns a complete list of objects created by a factory method you can set this to true in order to prevent object create by the factory again
+        concurrency -- if set the async factory method is executed concurrently for all items of a page, limited by this number
+        batch_factory -- a factory method which creates all objects of a page at once from the list of raw edges
+        retry -- a RetryPolicy to retry failed resolver calls
+        observer -- a RelayObserver which is notified about the resolver calls, the parsing and the factory calls
+        scheduler -- a RequestScheduler, or a handle of it with a priority, which is shared by many results to stay within the rate limits
+        factory_executor -- a concurrent.futures executor which runs the synchronous factory method for chunks of the edges
+        factory_chunk_size -- the number of edges which are sent to the factory executor at once
         """
-        super(SubResult, self).__init__(result, factory, is_async_factory)
+        self._observer = observer
+        self._scheduler = scheduler
+        super(SubResult, self).__init__(result, factory, is_async_factory, concurrency, batch_factory)
+        self._set_factory_executor(factory_executor, factory_chunk_size)
         self._params = params
         self._resolver = resolver
+        self._retry = retry
         self._resolver_returns_complete_objects = resolver_returns_complete_objects
 
-    async def _fetch_next_chunk(self):
-        after = self._pageInfo.end_cursor
+    def _resolver_params(self):
+        params = dict(self._params)
+        params[AFTER_PARAM] = self._pageInfo.end_cursor
+        return params
 
+    def _set_resolved_items(self, items):
+        self._report_factory()
+        self._data = DataFactory.from_list(items)
+        self._page_items = None
+        self._pageInfo = PageInfo.empty()
+
+        if self._resolver_returns_complete_objects:
+            self._factory = None
+            self._batch_factory = None
+
+    async def _call_resolver(self, params):
+        if self._scheduler is not None:
+            await self._scheduler.acquire(self._scheduler.estimate(params))
+
+        if self._observer is None:
+            return await self._resolver(**params)
+
+        context = self._observer.on_request_start(self._resolver, params)
+        start = time.perf_counter()
         try:
-            p = dict(self._params)
-            p["after"] = after
-            
-            items = await self._resolver(**p)
-            self._data = DataFactory.from_list(items)
-            self._pageInfo = PageInfo.empty()
+            items = await self._resolver(**params)
+        except Exception as error:
+            self._observer.on_request_end(context, time.perf_counter() - start, error)
+            raise
+
+        self._observer.on_request_end(context, time.perf_counter() - start)
+        return items
 
-            if self._resolver_returns_complete_objects:
-                self._factory = None 
-        except Exception:
-            traceback.print_exc()
-            raise StopAsyncIteration
+    async def _resolve(self):
+        params = self._resolver_params()
+        try:
+            if self._retry is None:
+                return await self._call_resolver(params)
+
+            return await self._retry.execute(lambda: self._call_resolver(params), self._observer)
+        except Exception as error:
+            if self._observer is not None:
+                self._observer.on_error(error)
+            raise PageFetchError(params[AFTER_PARAM], error) from error
+
+    async def _fetch_next_chunk(self):
+        self._set_resolved_items(await self._resolve())
 
     @staticmethod
-    async def get_all_children_from_node(dict, node_name, params, resolver_method, factory_method, is_async_factory=False , resolver_returns_complete_objects=False):
+    async def get_all_children_from_node(dict, node_name, params, resolver_method, factory_method, is_async_factory=False , resolver_returns_complete_objects=False, retry=None):
         children = []
         if node_name in dict:
             x = {
                 node_name: dict.pop(node_name)
             }
-            return await IterableResult.fetch_all(SubResult(x, resolver_method, params, factory_method, is_async_factory, resolver_returns_complete_objects))
+            return await IterableResult.fetch_all(SubResult(x, resolver_method, params, factory_method, is_async_factory, resolver_returns_complete_objects, retry=retry))
         
         return children
 
+    @staticmethod
+    async def get_all_children_from_nodes(nodes, node_name, params_method, resolver_method, factory_method, is_async_factory=False, resolver_returns_complete_objects=False, batch_resolver=None, concurrency=None, retry=None, observer=None, scheduler=None) -> list:
+        """Resolve the children of all given nodes together and return a list of children for every node
 
-    
+        Keyword arguments:
+        nodes -- the raw nodes which contain the child connection
+        node_name -- the name of the child connection within the nodes
+        params_method -- a method which returns the resolver params for a node
+        resolver_method -- a resolver method which is called for every node which has more children
+        factory_method -- a factory method to create objects from the raw result
+        is_async_factory -- set this to true if the factory method is async
+        resolver_returns_complete_objects -- set this to true if the resolvers already return objects created by a factory method
+        batch_resolver -- if set it is called once with a list of params (including 'after') for all nodes which have more children and must return a list of items for every entry
+        concurrency -- limits the number of concurrent resolver calls if there is no batch resolver
+        retry -- a RetryPolicy to retry failed resolver calls
+        observer -- a RelayObserver which is notified about the resolver calls and the factory calls
+        scheduler -- a RequestScheduler which delays the resolver calls to stay within the rate limits
+        """
+        sub_results = []
+        children = []
+        for node in nodes:
+            if node_name in node:
+                x = {
+                    node_name: node.pop(node_name)
+                }
+                sub_result = SubResult(x, resolver_method, params_method(node), factory_method, is_async_factory, resolver_returns_complete_objects, retry=retry, observer=observer, scheduler=scheduler)
+                sub_results.append(sub_result)
+                children.append(await sub_result.all_from_current_page_async() if is_async_factory else sub_result.all_from_current_page())
+            else:
+                sub_results.append(None)
+                children.append([])
+
+        pending = [index for index, sub_result in enumerate(sub_results) if sub_result is not None and sub_result._pageInfo.has_next]
+        if len(pending) == 0:
+            return children
+
+        if batch_resolver is not None:
+            batch_params = [sub_results[index]._resolver_params() for index in pending]
+            if scheduler is not None:
+                await scheduler.acquire(sum(scheduler.estimate(x) for x in batch_params))
+
+            try:
+                if retry is None:
+                    resolved = await batch_resolver(batch_params)
+                else:
+                    resolved = await retry.execute(lambda: batch_resolver(batch_params), observer)
+            except Exception as error:
+                if observer is not None:
+                    observer.on_error(error)
+                # there is no single cursor to resume from as the batch contains many child connections
+                raise PageFetchError(None, error) from error
+        else:
+            semaphore = asyncio.Semaphore(concurrency if concurrency is not None else len(pending))
+
+            async def resolve(sub_result):
+                async with semaphore:
+                    return await sub_result._resolve()
+
+            resolved = await asyncio.gather(*[resolve(sub_results[index]) for index in pending])
+
+        for index, items in zip(pending, resolved):
+            sub_result = sub_results[index]
+            sub_result._set_resolved_items(items)
+            children[index] += await sub_result.all_from_current_page_async() if is_async_factory else sub_result.all_from_current_page()
+
+        return children
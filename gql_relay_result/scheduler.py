@@ -0,0 +1,210 @@
+# Copyright (c) 2020 UniversalAppFactory
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+import asyncio
+import heapq
+import itertools
+import time
+
+# lower priorities are dispatched first
+INTERACTIVE = 0
+DEFAULT = 5
+BULK = 10
+
+
+def edge_cost(params):
+    """
+    estimates the cost of a request by the number of requested edges
+    """
+    return params.get("first") or params.get("last") or 1
+
+
+class TokenBucket:
+
+    def __init__(self, rate, burst=None) -> None:
+        """Create a new bucket which is refilled continuously
+
+        Keyword arguments:
+        rate -- the number of tokens which are added per second
+        burst -- the capacity of the bucket, by default it's the rate
+        """
+        self.rate = rate
+        self.burst = burst if burst is not None else rate
+        self.tokens = self.burst
+        self._updated = time.monotonic()
+
+    def _refill(self, now):
+        if now > self._updated:
+            self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def delay(self, tokens, now):
+        """
+        returns the seconds until the tokens are available, requests which cost more than the capacity wait for a full bucket
+        """
+        self._refill(now)
+        needed = min(tokens, self.burst)
+        return max(needed - self.tokens, 0) / self.rate
+
+    def take(self, tokens, now):
+        self._refill(now)
+        self.tokens -= tokens
+
+
+class RequestScheduler:
+
+    def __init__(self, rate=None, burst=None, cost_rate=None, cost_burst=None, cost=edge_cost, budget=None, budget_reserve=0) -> None:
+        """Create a new scheduler which can be shared by many results to keep their requests within the rate limits of an API
+
+        The requests are queued and dispatched by their priority as soon as the token buckets allow it.
+
+        Keyword arguments:
+        rate -- the maximum number of requests per second, there is no limit if it's None
+        burst -- the number of requests which can be sent at once, by default it's the rate
+        cost_rate -- the maximum cost per second, there is no limit if it's None
+        cost_burst -- the cost which can be spent at once, by default it's the cost rate
+        cost -- a method which estimates the cost of a request by its variables, by default it's the number of requested edges
+        budget -- a method which reads a (remaining budget, seconds until reset) tuple or None from every response, if the remaining
+                  budget is below the cost of the next request all requests wait until the reset
+        budget_reserve -- the part of the remaining budget which is never spent, e.g. for other clients of the same API
+        """
+        self._requests = TokenBucket(rate, burst) if rate is not None else None
+        self._costs = TokenBucket(cost_rate, cost_burst) if cost_rate is not None else None
+        self._cost = cost
+        self._budget = budget
+        self.budget_reserve = budget_reserve
+        self._remaining = None
+        self._reset_at = None
+        self._paused_until = 0.0
+        self._waiting = []
+        self._sequence = itertools.count()
+        self._task = None
+        self._wakeup = None
+        self.dispatched = 0
+
+    def estimate(self, params):
+        return self._cost(params) if self._cost is not None else 1
+
+    def with_priority(self, priority):
+        """
+        returns a handle with the given priority which can be passed to results instead of the scheduler,
+        lower numbers are dispatched first, e.g. INTERACTIVE before BULK
+        """
+        return _PriorityHandle(self, priority)
+
+    def _delay(self, cost, now):
+        delay = max(self._paused_until - now, 0)
+        if self._remaining is not None and self._reset_at is not None:
+            if now >= self._reset_at:
+                # the budget has been reset, the next response tells the new remaining budget
+                self._remaining = None
+            elif self._remaining - self.budget_reserve < cost:
+                delay = max(delay, self._reset_at - now)
+        if self._requests is not None:
+            delay = max(delay, self._requests.delay(1, now))
+        if self._costs is not None:
+            delay = max(delay, self._costs.delay(cost, now))
+
+        return delay
+
+    async def _dispatch(self):
+        while self._waiting:
+            _, _, cost, future = self._waiting[0]
+            if future.done():
+                heapq.heappop(self._waiting)
+                continue
+
+            now = time.monotonic()
+            delay = self._delay(cost, now)
+            if delay > 0:
+                # a request with a higher priority may arrive while waiting, so the queue is checked again afterwards
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self._waiting)
+            if self._requests is not None:
+                self._requests.take(1, now)
+            if self._costs is not None:
+                self._costs.take(cost, now)
+            if self._remaining is not None:
+                self._remaining -= cost
+
+            self.dispatched += 1
+            future.set_result(None)
+
+    async def acquire(self, cost=1, priority=DEFAULT):
+        """
+        waits until a request with the given cost and priority can be sent
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        heapq.heappush(self._waiting, (priority, next(self._sequence), cost, future))
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = loop.create_task(self._dispatch())
+        else:
+            self._wakeup.set()
+
+        await future
+
+    def record(self, result):
+        """
+        reads the remaining budget from a response
+        """
+        if self._budget is None or not isinstance(result, dict):
+            return
+
+        budget = self._budget(result)
+        if budget is None:
+            return
+
+        remaining, reset_seconds = budget
+        self._remaining = remaining
+        self._reset_at = time.monotonic() + reset_seconds if reset_seconds is not None else None
+
+    def pause(self, seconds):
+        """
+        stops dispatching requests for the given time, e.g. after the API has answered with a throttling error
+        """
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+
+class _PriorityHandle:
+
+    def __init__(self, scheduler, priority) -> None:
+        self.scheduler = scheduler
+        self.priority = priority
+
+    def estimate(self, params):
+        return self.scheduler.estimate(params)
+
+    async def acquire(self, cost=1, priority=None):
+        await self.scheduler.acquire(cost, self.priority if priority is None else priority)
+
+    def record(self, result):
+        self.scheduler.record(result)
+
+    def pause(self, seconds):
+        self.scheduler.pause(seconds)
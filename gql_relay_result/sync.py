@@ -0,0 +1,141 @@
+# Copyright (c) 2020 UniversalAppFactory
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+import hashlib
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+
+END_CURSOR_TOKEN = "end_cursor"
+CHECKSUM_TOKEN = "checksum"
+
+
+def page_checksum(edges) -> str:
+    """
+    returns a checksum of the edges of a page, the edges can be raw dictionaries or compact edges
+    """
+    payload = json.dumps([dict(x) for x in edges], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SyncStateStore(ABC):
+    """
+    base class for stores which keep the sync state of incremental results, the state is a dictionary
+    with the end_cursor of the last run and optionally the checksum of the first page
+    """
+
+    @abstractmethod
+    def get(self, key):
+        pass
+
+    @abstractmethod
+    def set(self, key, state):
+        pass
+
+
+class MemoryStateStore(SyncStateStore):
+    """
+    keeps the sync state in memory, e.g. for a long running process which polls the same connections
+    """
+
+    def __init__(self) -> None:
+        self._states = {}
+
+    def get(self, key):
+        state = self._states.get(key)
+        return dict(state) if state is not None else None
+
+    def set(self, key, state):
+        self._states[key] = dict(state)
+
+
+class JsonFileStateStore(SyncStateStore):
+
+    def __init__(self, path) -> None:
+        """Create a new store which keeps the sync states of all keys in a single JSON file
+
+        Keyword arguments:
+        path -- the path of the file, it's created by the first call of set
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _read(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
+
+    def get(self, key):
+        with self._lock:
+            return self._read().get(key)
+
+    def set(self, key, state):
+        with self._lock:
+            states = self._read()
+            states[key] = state
+            # the file is replaced at once so that an interrupted run can't leave a broken file behind
+            temporary = f"{self.path}.tmp"
+            with open(temporary, "w", encoding="utf-8") as file:
+                json.dump(states, file)
+
+            os.replace(temporary, self.path)
+
+
+class IncrementalSync:
+    """
+    the sync state of an incremental result while it's iterated
+    """
+
+    def __init__(self, store, key, verify_checksum=False, is_invalid_cursor=None) -> None:
+        state = store.get(key) or {}
+        self.store = store
+        self.key = key
+        self.verify_checksum = verify_checksum
+        self.is_invalid_cursor = is_invalid_cursor or (lambda error: True)
+        self.end_cursor = state.get(END_CURSOR_TOKEN)
+        self.checksum = state.get(CHECKSUM_TOKEN)
+        # true until the first page after the saved cursor has been fetched
+        self.resuming = self.end_cursor is not None
+        self.full_scan = self.end_cursor is None
+
+    def invalidate(self):
+        self.resuming = False
+        self.full_scan = True
+
+    def page_fetched(self, page_info, edges, first_page):
+        self.resuming = False
+        # an empty page after the saved cursor has no end cursor, so the saved cursor is kept
+        if page_info.end_cursor is not None:
+            self.end_cursor = page_info.end_cursor
+
+        if first_page and self.verify_checksum:
+            self.checksum = page_checksum(edges)
+
+    def save(self):
+        if self.end_cursor is None:
+            return
+
+        state = {END_CURSOR_TOKEN: self.end_cursor}
+        if self.checksum is not None:
+            state[CHECKSUM_TOKEN] = self.checksum
+
+        self.store.set(self.key, state)
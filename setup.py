@@ -13,10 +13,14 @@ setup(
       long_description_content_type="text/markdown",
       version='0.0.6',
       url="https://github.com/universalappfactory/gql-relay-result",
-      packages=find_packages(exclude=['tests', 'tests.*']),
+      packages=find_packages(exclude=['tests', 'tests.*', 'benchmarks', 'benchmarks.*']),
       install_requires=[
         'gql>=3.0.0a4',
       ],
+      extras_require={
+        'aiohttp': ['aiohttp>=3.7'],
+        'opentelemetry': ['opentelemetry-api>=1.0'],
+      },
       keywords="api graphql protocol rest relay gql client",
       classifiers=[
         "Programming Language :: Python :: 3",
@@ -0,0 +1,97 @@
+import os
+import tempfile
+import time
+import unittest
+from gql_relay_result.cache import MemoryPageCache, PageCache, SqlitePageCache, page_key, query_text
+from gql import gql
+
+
+class PageCacheTests(unittest.TestCase):
+
+    QUERY = """
+            query getNumericValues($first: Int, $after: String) {
+                numericValues(first: $first, after: $after) {
+                    edges {
+                        node {
+                            value
+                        }
+                    }
+                }
+            }
+            """
+
+    PAGE = {"numericvalues": {"edges": [{"node": {"value": 1}}]}}
+
+    def test_that_page_key_depends_on_variables_and_cursor(self):
+        text = query_text(gql(PageCacheTests.QUERY))
+
+        key = page_key(text, {"first": 5, "after": "a"})
+
+        self.assertEqual(key, page_key(text, {"after": "a", "first": 5}))
+        self.assertNotEqual(key, page_key(text, {"first": 5, "after": "b"}))
+        self.assertNotEqual(key, page_key(text, {"first": 6, "after": "a"}))
+
+    def test_that_memory_cache_evicts_least_recently_used_pages(self):
+        sut = MemoryPageCache(max_size=2)
+
+        sut.set("a", PageCacheTests.PAGE)
+        sut.set("b", PageCacheTests.PAGE)
+        sut.get("a")
+        sut.set("c", PageCacheTests.PAGE)
+
+        self.assertIsNone(sut.get("b"))
+        self.assertDictEqual(PageCacheTests.PAGE, sut.get("a"))
+        self.assertDictEqual({"hits": 2, "misses": 1, "evictions": 1, "errors": 0}, sut.stats())
+
+    def test_that_pages_which_cant_be_encoded_are_counted_as_errors(self):
+        page = {"numericvalues": {"edges": [{"node": {"value": object()}}]}}
+        with tempfile.TemporaryDirectory() as directory:
+            caches = [MemoryPageCache(), SqlitePageCache(os.path.join(directory, "pages.db"))]
+            for sut in caches:
+                sut.set("a", page)
+
+                self.assertIsNone(sut.get("a"))
+                self.assertEqual(sut.errors, 1)
+
+            caches[1].close()
+
+    def test_that_incomplete_caches_cant_be_created(self):
+        class GetOnlyCache(PageCache):
+            def get(self, key):
+                return None
+
+        with self.assertRaises(TypeError):
+            GetOnlyCache()
+
+    def test_that_memory_cache_returns_copies(self):
+        sut = MemoryPageCache()
+
+        sut.set("a", PageCacheTests.PAGE)
+        sut.get("a")["numericvalues"]["edges"][0].pop("node")
+
+        self.assertDictEqual(PageCacheTests.PAGE, sut.get("a"))
+
+    def test_that_memory_cache_expires_pages(self):
+        sut = MemoryPageCache(ttl=0.01)
+
+        sut.set("a", PageCacheTests.PAGE)
+        time.sleep(0.02)
+
+        self.assertIsNone(sut.get("a"))
+        self.assertEqual(sut.evictions, 1)
+
+    def test_that_sqlite_cache_is_shared_between_instances(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "pages.db")
+            first = SqlitePageCache(path, max_size=1)
+            first.set("a", PageCacheTests.PAGE)
+            first.set("b", PageCacheTests.PAGE)
+            first.close()
+
+            sut = SqlitePageCache(path)
+
+            self.assertIsNone(sut.get("a"))
+            self.assertDictEqual(PageCacheTests.PAGE, sut.get("b"))
+            self.assertEqual(first.evictions, 1)
+            self.assertEqual(len(sut), 1)
+            sut.close()
@@ -0,0 +1,45 @@
+import importlib.util
+import json
+import unittest
+from gql_relay_result.decoders import GraphQLResponseError, JsonDecoder, MsgspecDecoder, OrjsonDecoder, get_decoder
+
+
+class DecoderTests(unittest.TestCase):
+
+    CONNECTION = {
+        "totalCount": 2,
+        "pageInfo": {"startCursor": "a", "endCursor": "b", "hasNextPage": False, "hasPreviousPage": False},
+        "edges": [{"node": {"value": 1}}, {"node": {"value": 2}}]
+    }
+
+    RAW = json.dumps({"data": {"viewer": {"login": "me", "repos": CONNECTION}, "rateLimit": {"remaining": 10}}}).encode("utf-8")
+
+    def test_that_json_decoder_returns_data(self):
+        actual = JsonDecoder().decode(DecoderTests.RAW)
+
+        self.assertDictEqual(DecoderTests.CONNECTION, actual["viewer"]["repos"])
+
+    def test_that_errors_are_raised(self):
+        raw = json.dumps({"data": None, "errors": [{"message": "throttled"}]})
+
+        with self.assertRaises(GraphQLResponseError) as context:
+            JsonDecoder().decode(raw)
+
+        self.assertListEqual([{"message": "throttled"}], context.exception.errors)
+
+    def test_that_unknown_decoder_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            get_decoder("unknown")
+
+    @unittest.skipIf(importlib.util.find_spec("orjson") is None, "orjson is not installed")
+    def test_that_orjson_decoder_returns_data(self):
+        actual = OrjsonDecoder().decode(DecoderTests.RAW)
+
+        self.assertDictEqual(DecoderTests.CONNECTION, actual["viewer"]["repos"])
+
+    @unittest.skipIf(importlib.util.find_spec("msgspec") is None, "msgspec is not installed")
+    def test_that_partial_msgspec_decoder_only_decodes_the_connection(self):
+        actual = MsgspecDecoder(partial=True).decode(DecoderTests.RAW, ("viewer", "repos"))
+
+        expected = {"pageInfo": DecoderTests.CONNECTION["pageInfo"], "edges": DecoderTests.CONNECTION["edges"]}
+        self.assertDictEqual({"viewer": {"repos": expected}}, actual)
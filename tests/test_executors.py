@@ -0,0 +1,274 @@
+import asyncio
+import importlib.util
+import json
+import unittest
+from unittest import IsolatedAsyncioTestCase
+from gql_relay_result.cursors import cursor_to_offset, offset_to_cursor
+from gql_relay_result.executors import BatchingExecutor, SingleFlight
+from gql_relay_result.relay_result import GqlRelayResult, IterableResult, SubResult
+from gql import gql
+from graphql import GraphQLSyntaxError, build_schema, graphql, print_ast
+
+if importlib.util.find_spec("aiohttp") is not None:
+    from aiohttp import web
+    from gql_relay_result.executors import HttpExecutor
+
+
+QUERY = """
+        query getNumericValues($first: Int, $after: String) {
+            numericValues(first: $first, after: $after) {
+                pageInfo {
+                  hasNextPage,
+                  hasPreviousPage,
+                  startCursor,
+                  endCursor
+                }
+                edges {
+                    node {
+                        value
+                    }
+                }
+            }
+        }
+        """
+
+
+class GraphQLStandIn:
+    """
+    a local GraphQL server which serves the numericValues connection for all queries
+    """
+
+    def __init__(self, values) -> None:
+        self.values = values
+        self.requests = []
+        self.peers = set()
+
+    async def handle(self, request):
+        payload = await request.json()
+        self.requests.append(payload)
+        self.peers.add(request.transport.get_extra_info("peername"))
+
+        variables = payload["variables"]
+        after = variables.get("after")
+        start = 0 if after is None else cursor_to_offset(after) + 1
+        end = min(start + variables["first"], len(self.values))
+        connection = {
+            "edges": [{"node": {"value": x}} for x in self.values[start:end]],
+            "pageInfo": {
+                "startCursor": offset_to_cursor(start),
+                "endCursor": offset_to_cursor(end - 1),
+                "hasNextPage": end < len(self.values),
+                "hasPreviousPage": start > 0
+            }
+        }
+        return web.json_response({"data": {"numericValues": connection}})
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post("/graphql", self.handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}/graphql"
+
+    async def stop(self):
+        await self._runner.cleanup()
+
+
+@unittest.skipIf(importlib.util.find_spec("aiohttp") is None, "aiohttp is not installed")
+class HttpExecutorTests(IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.server = GraphQLStandIn(list(range(10)))
+        self.url = await self.server.start()
+
+    async def asyncTearDown(self):
+        await self.server.stop()
+
+    async def test_that_all_pages_are_fetched_by_one_connection(self):
+        async with HttpExecutor(self.url, limit=1) as executor:
+            first = GqlRelayResult.from_query(gql(QUERY), {"first": 3}, executor)
+            second = GqlRelayResult.from_query(gql(QUERY), {"first": 4}, executor)
+
+            actual = [x["node"]["value"] for x in await IterableResult.fetch_all(first)]
+            actual += [x["node"]["value"] for x in await IterableResult.fetch_all(second)]
+
+        self.assertListEqual(list(range(10)) * 2, actual)
+        self.assertEqual(len(self.server.requests), 7)
+        self.assertEqual(len(self.server.peers), 1)
+        self.assertEqual(self.server.requests[1]["variables"], {"first": 3, "after": offset_to_cursor(2)})
+
+    async def test_that_raw_responses_are_decoded_by_the_result(self):
+        async with HttpExecutor(self.url, raw=True) as executor:
+            self.assertIsInstance(await executor(gql(QUERY), {"first": 3}), bytes)
+
+            result = GqlRelayResult.from_query(gql(QUERY), {"first": 3}, executor)
+            actual = [x["node"]["value"] for x in await IterableResult.fetch_all(result)]
+
+        self.assertListEqual(list(range(10)), actual)
+
+
+class BatchingExecutorTests(IsolatedAsyncioTestCase):
+
+    SCHEMA = """
+        type PageInfo { hasNextPage: Boolean!, hasPreviousPage: Boolean!, startCursor: String, endCursor: String }
+        type Node { value: Int }
+        type Edge { node: Node }
+        type Connection { pageInfo: PageInfo!, edges: [Edge] }
+        type Query { numericValues(first: Int, after: String): Connection }
+        """
+
+    def setUp(self):
+        self.documents = []
+        values = list(range(10))
+
+        def numeric_values(info, first, after=None):
+            start = 0 if after is None else cursor_to_offset(after) + 1
+            end = min(start + first, len(values))
+            return {
+                "edges": [{"node": {"value": x}} for x in values[start:end]],
+                "pageInfo": {
+                    "startCursor": offset_to_cursor(start),
+                    "endCursor": offset_to_cursor(end - 1),
+                    "hasNextPage": end < len(values),
+                    "hasPreviousPage": start > 0
+                }
+            }
+
+        schema = build_schema(BatchingExecutorTests.SCHEMA)
+
+        async def executor(query, params):
+            text = print_ast(query.document)
+            self.documents.append(text)
+            result = await graphql(schema, text, root_value={"numericValues": numeric_values}, variable_values=params)
+            if result.errors:
+                raise result.errors[0]
+
+            return result.data
+
+        self.executor = executor
+
+    async def test_that_concurrent_requests_are_combined(self):
+        sut = BatchingExecutor(self.executor, window=0.01)
+        results = [GqlRelayResult.from_query(gql(QUERY), {"first": first}, sut) for first in (2, 3, 5)]
+
+        actual = await asyncio.gather(*[IterableResult.fetch_all(x) for x in results])
+
+        self.assertListEqual([list(range(10))] * 3, [[x["node"]["value"] for x in items] for items in actual])
+        self.assertEqual(sut.requests, 11)
+        self.assertEqual(len(self.documents), 5)
+        self.assertIn("c2_numericValues: numericValues(first: $first_2, after: $after_2)", self.documents[0])
+
+    async def test_that_requests_are_sent_when_the_batch_is_full(self):
+        sut = BatchingExecutor(self.executor, window=60, max_batch=2)
+
+        actual = await asyncio.gather(sut(gql(QUERY), {"first": 1}), sut(gql(QUERY), {"first": 2}))
+
+        self.assertListEqual([[0], [0, 1]], [[x["node"]["value"] for x in page["numericValues"]["edges"]] for page in actual])
+        self.assertEqual(len(self.documents), 1)
+
+    async def test_that_errors_of_combining_requests_are_passed_to_all_callers(self):
+        sut = BatchingExecutor(self.executor, window=0.01)
+        malformed = "query getNumericValues($first: Int { numericValues(first: $first) { edges"
+
+        actual = await asyncio.wait_for(asyncio.gather(sut(malformed, {"first": 1}), sut(malformed, {"first": 2}), return_exceptions=True), 1)
+
+        self.assertTrue(all(isinstance(x, GraphQLSyntaxError) for x in actual))
+        self.assertEqual(len(sut._tasks), 0)
+
+    async def test_that_responses_which_cant_be_split_are_passed_to_all_callers(self):
+        async def executor(query, params):
+            return "not a dictionary"
+
+        sut = BatchingExecutor(executor, window=0.01)
+
+        actual = await asyncio.wait_for(asyncio.gather(sut(gql(QUERY), {"first": 1}), sut(gql(QUERY), {"first": 2}), return_exceptions=True), 1)
+
+        self.assertTrue(all(isinstance(x, TypeError) for x in actual))
+
+
+class SingleFlightTests(IsolatedAsyncioTestCase):
+
+    async def test_that_concurrent_equal_calls_are_collapsed(self):
+        calls = []
+
+        async def executor(query, params):
+            calls.append(params)
+            await asyncio.sleep(0.01)
+            return {"value": params["first"]}
+
+        sut = SingleFlight(executor)
+        actual = await asyncio.gather(*[sut(gql(QUERY), {"first": first}) for first in (1, 1, 2, 1)])
+
+        self.assertListEqual([1, 1, 2, 1], [x["value"] for x in actual])
+        self.assertEqual(len(calls), 2)
+        self.assertDictEqual({"calls": 4, "executions": 2, "collapsed": 2}, sut.stats())
+        self.assertIsNot(actual[0], actual[1])
+
+        await sut(gql(QUERY), {"first": 1})
+        self.assertEqual(len(calls), 3)
+
+    async def test_that_collapsed_resolver_calls_share_errors(self):
+        async def resolver(id, after):
+            await asyncio.sleep(0.01)
+            raise ConnectionError(id)
+
+        sut = SingleFlight(resolver)
+        actual = await asyncio.gather(sut(id="a", after=None), sut(after=None, id="a"), return_exceptions=True)
+
+        self.assertTrue(all(isinstance(x, ConnectionError) for x in actual))
+        self.assertEqual(sut.executions, 1)
+
+    async def test_that_cancelling_the_first_caller_doesnt_cancel_the_others(self):
+        calls = []
+
+        async def executor(query, params):
+            calls.append(params)
+            await asyncio.sleep(0.05)
+            return {"value": params["first"]}
+
+        sut = SingleFlight(executor)
+        leader = asyncio.ensure_future(asyncio.wait_for(sut(gql(QUERY), {"first": 1}), 0.01))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(sut(gql(QUERY), {"first": 1}))
+
+        with self.assertRaises(asyncio.TimeoutError):
+            await leader
+        self.assertDictEqual({"value": 1}, await follower)
+        self.assertEqual(len(calls), 1)
+
+    async def test_that_the_call_is_cancelled_if_all_callers_are_cancelled(self):
+        cancelled = asyncio.Event()
+
+        async def executor(query, params):
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        sut = SingleFlight(executor)
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(sut(gql(QUERY), {"first": 1}), 0.01)
+
+        await asyncio.wait_for(cancelled.wait(), 1)
+        self.assertDictEqual({}, sut._in_flight)
+
+    async def test_that_sub_results_share_resolver_calls(self):
+        resolved = []
+
+        async def resolver(id, after):
+            resolved.append(id)
+            await asyncio.sleep(0.01)
+            return [{"node": {"value": 2}}]
+
+        sut = SingleFlight(resolver)
+        connection = {"children": {"edges": [{"node": {"value": 1}}], "pageInfo": {"startCursor": None, "endCursor": "0", "hasNextPage": True, "hasPreviousPage": False}}}
+        nodes = [json.loads(json.dumps(connection)) for _ in range(3)]
+
+        children = await SubResult.get_all_children_from_nodes(nodes, "children", lambda node: {"id": "shared"}, sut, lambda x: x.pop("node")["value"])
+
+        self.assertListEqual([[1, 2]] * 3, children)
+        self.assertListEqual(["shared"], resolved)
@@ -0,0 +1,85 @@
+import importlib.util
+import unittest
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import MagicMock
+from gql_relay_result.observers import CompositeObserver, Histogram, MetricsCollector, OpenTelemetryObserver, RelayObserver
+from gql_relay_result.relay_result import GqlRelayResult, IterableResult, PageFetchError, RetryPolicy
+
+
+def page(values, has_next):
+    return {"numericvalues": {
+        "edges": [{"node": {"value": x}} for x in values],
+        "pageInfo": {"startCursor": None, "endCursor": str(values[-1]), "hasNextPage": has_next, "hasPreviousPage": False}
+    }}
+
+
+class ObserverTests(IsolatedAsyncioTestCase):
+
+    def test_that_histogram_quantiles_are_bucket_bounds(self):
+        sut = Histogram(buckets=(0.1, 1.0))
+        for value in (0.05, 0.05, 0.5, 2.0):
+            sut.observe(value)
+
+        self.assertEqual(sut.quantile(0.5), 0.1)
+        self.assertEqual(sut.quantile(0.75), 1.0)
+        self.assertEqual(sut.quantile(1.0), 2.0)
+        self.assertEqual(sut.snapshot()["count"], 4)
+
+    async def test_that_collector_counts_requests_pages_items_and_retries(self):
+        sut = MetricsCollector()
+        responses = [ConnectionError(), page([4, 5, 6], True), page([7, 8], False)]
+
+        async def executor(query, params):
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        result = GqlRelayResult(page([1, 2, 3], True), "query", {"first": 3}, executor, factory=lambda x: x["node"]["value"],
+                                retry=RetryPolicy(attempts=2, base_delay=0), observer=sut)
+        actual = await IterableResult.fetch_all(result)
+
+        self.assertListEqual([1, 2, 3, 4, 5, 6, 7, 8], actual)
+        snapshot = sut.snapshot()
+        self.assertEqual(snapshot["requests"], 3)
+        self.assertEqual(snapshot["retries"], 1)
+        self.assertEqual(snapshot["pages"], 3)
+        self.assertEqual(snapshot["items"], 8)
+        self.assertEqual(snapshot["created"], 8)
+        self.assertEqual(snapshot["factory_latency"]["count"], 3)
+        self.assertEqual(snapshot["errors"], 0)
+
+    async def test_that_failed_requests_are_reported(self):
+        observer = MagicMock(spec=RelayObserver)
+        observer.on_request_start.return_value = "context"
+        error = ConnectionError()
+
+        async def executor(query, params):
+            raise error
+
+        result = GqlRelayResult(page([1], True), "query", {"first": 1}, executor, observer=CompositeObserver([observer]))
+        with self.assertRaises(PageFetchError):
+            await IterableResult.fetch_all(result)
+
+        observer.on_request_start.assert_called_once_with("query", {"first": 1, "after": "1"})
+        self.assertEqual(observer.on_request_end.call_args.args[0], "context")
+        self.assertIs(observer.on_request_end.call_args.args[2], error)
+        observer.on_error.assert_called_once_with(error)
+
+    @unittest.skipIf(importlib.util.find_spec("opentelemetry") is None, "opentelemetry isn't installed")
+    async def test_that_spans_are_recorded_for_every_request(self):
+        tracer = MagicMock()
+
+        async def executor(query, params):
+            return page([2], False)
+
+        result = GqlRelayResult(page([1], True), "query", {"first": 1}, executor, observer=OpenTelemetryObserver(tracer))
+        await IterableResult.fetch_all(result)
+
+        tracer.start_span.assert_called_once_with("graphql.page")
+        tracer.start_span.return_value.end.assert_called_once()
+
+    @unittest.skipIf(importlib.util.find_spec("opentelemetry") is not None, "opentelemetry is installed")
+    def test_that_open_telemetry_observer_requires_opentelemetry(self):
+        with self.assertRaises(ImportError):
+            OpenTelemetryObserver()
@@ -0,0 +1,141 @@
+import asyncio
+from unittest import IsolatedAsyncioTestCase
+from gql_relay_result.relay_result import GqlRelayResult, PageFetchError
+
+
+def executor_for(values, page_size, requests):
+    async def executor(query, params):
+        requests.append(params)
+        start = int(params["after"]) + 1 if params.get("after") is not None else 0
+        end = min(start + page_size, len(values))
+        return {"numericvalues": {
+            "edges": [{"cursor": str(i), "node": {"value": values[i]}} for i in range(start, end)],
+            "pageInfo": {"startCursor": str(start), "endCursor": str(end - 1), "hasNextPage": end < len(values), "hasPreviousPage": start > 0}
+        }}
+
+    return executor
+
+
+def value(edge):
+    return edge["node"]["value"]
+
+
+class PipelineTests(IsolatedAsyncioTestCase):
+
+    async def create(self, count, page_size, requests, **kwargs):
+        executor = executor_for(list(range(count)), page_size, requests)
+        result = await executor("query", {"first": page_size})
+        return GqlRelayResult(result, "query", {"first": page_size}, executor, **kwargs)
+
+    async def test_that_map_and_filter_are_applied_to_all_pages(self):
+        requests = []
+        sut = await self.create(10, 3, requests)
+
+        actual = await sut.map(value).filter(lambda x: x % 2 == 0).map(lambda x: x * 10).collect()
+
+        self.assertListEqual([0, 20, 40, 60, 80], actual)
+        self.assertEqual(4, len(requests))
+
+    async def test_that_take_stops_fetching_pages(self):
+        requests = []
+        sut = await self.create(100, 5, requests, prefetch=1)
+
+        actual = [x async for x in sut.map(value).take(7)]
+
+        self.assertListEqual(list(range(7)), actual)
+        # the first page is passed to the result, the second page has been fetched and the prefetched third page is cancelled
+        self.assertLessEqual(len(requests), 3)
+        self.assertTrue(sut._prefetch_task is None or sut._prefetch_task.done())
+
+    async def test_that_batch_regroups_items_across_pages(self):
+        requests = []
+        sut = await self.create(10, 3, requests)
+
+        actual = await sut.map(value).batch(4).collect()
+
+        self.assertListEqual([[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]], actual)
+
+    async def test_that_take_after_batch_counts_batches(self):
+        requests = []
+        sut = await self.create(100, 10, requests)
+
+        actual = await sut.map(value).batch(4).take(2).collect()
+
+        self.assertListEqual([[0, 1, 2, 3], [4, 5, 6, 7]], actual)
+        self.assertEqual(1, len(requests))
+
+    async def test_that_map_concurrent_limits_the_running_calls_and_keeps_the_order(self):
+        requests = []
+        sut = await self.create(20, 10, requests)
+        running = 0
+        peak = 0
+
+        async def double(x):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.001 * (x % 3))
+            running -= 1
+            return x * 2
+
+        actual = await sut.map(value).map_concurrent(double, limit=3).collect()
+
+        self.assertListEqual([x * 2 for x in range(20)], actual)
+        self.assertEqual(3, peak)
+
+    async def test_that_buffer_bounds_the_pages_fetched_ahead(self):
+        requests = []
+        sut = await self.create(100, 5, requests)
+        pages = sut.map(value).buffer(2).pages()
+
+        await pages.__anext__()
+        await asyncio.sleep(0.01)
+
+        # the initial page, two buffered pages and one page which waits for space in the buffer
+        self.assertLessEqual(len(requests), 4)
+        await pages.aclose()
+
+    async def test_that_errors_of_the_buffered_source_are_raised(self):
+        async def executor(query, params):
+            raise ValueError("failed")
+
+        initial = await executor_for([1, 2, 3], 2, [])("query", {"first": 2})
+        sut = GqlRelayResult(initial, "query", {"first": 2}, executor)
+
+        with self.assertRaises(PageFetchError):
+            await sut.map(value).buffer(1).collect()
+
+    async def test_that_operators_return_new_pipelines(self):
+        requests = []
+        sut = await self.create(10, 5, requests)
+        mapped = sut.map(value)
+
+        filtered = mapped.filter(lambda x: x > 100)
+
+        self.assertIsNot(mapped, filtered)
+        self.assertListEqual([], await filtered.collect())
+
+    async def test_that_a_pipeline_can_run_again(self):
+        requests = []
+        sut = await self.create(10, 5, requests, prefetch=1)
+        pipeline = sut.map(value).take(4)
+        batches = sut.map(value).batch(3)
+
+        self.assertListEqual([0, 1, 2, 3], await pipeline.collect())
+        self.assertListEqual([0, 1, 2, 3], await pipeline.collect())
+        async for batch in batches:
+            break
+        self.assertListEqual([[0, 1, 2]], await batches.take(1).collect())
+        self.assertListEqual(list(range(10)), await asyncio.wait_for(sut.map(value).collect(), 1))
+
+    async def test_that_prefetched_pages_are_cancelled_if_the_consumer_stops(self):
+        requests = []
+        sut = await self.create(100, 5, requests, prefetch=2)
+
+        items = sut.map(value).__aiter__()
+        async for x in items:
+            if x == 6:
+                break
+        await items.aclose()
+
+        self.assertTrue(sut._prefetch_task is None or sut._prefetch_task.done())
@@ -1,8 +1,24 @@
 from typing import Any
+import array
+import asyncio
+import concurrent.futures
+import copy
+import datetime
+import gc
+import importlib.util
+import io
+import json
+import math
+import pickle
+import weakref
 import unittest
 from unittest import IsolatedAsyncioTestCase
 from unittest.mock import MagicMock, AsyncMock, call
-from gql_relay_result.relay_result import GqlRelayResult, SubResult, IterableResult
+from gql_relay_result.relay_result import GqlRelayResult, SubResult, IterableResult, AdaptivePageSize, CompactEdge, PageFetchError, RetryPolicy, SeekableRelayResult
+from gql_relay_result.cache import MemoryPageCache
+from gql_relay_result.decoders import GraphQLResponseError
+from gql_relay_result.cursors import cursor_to_offset, offset_to_cursor
+from gql_relay_result.sync import MemoryStateStore
 from gql import gql
 
 
@@ -64,6 +80,65 @@ class DataWithId:
         return DataWithId(children=children, **node)
 
 
+def node_value(edge):
+    return edge["node"]["value"]
+
+
+def connection_executor(values, requests):
+    """
+    returns an executor which pages through the values by the first/after and the last/before variables
+    """
+    async def executor(query, params):
+        requests.append(params)
+        if "last" in params:
+            end = int(params["before"]) if params.get("before") is not None else len(values)
+            start = max(end - params["last"], 0)
+        else:
+            if params.get("after") is not None and int(params["after"]) >= len(values):
+                raise GraphQLResponseError([{"message": f"invalid cursor {params['after']}"}])
+
+            start = int(params["after"]) + 1 if params.get("after") is not None else 0
+            end = min(start + params["first"], len(values))
+
+        return {"numericvalues": {
+            "edges": [{"cursor": str(i), "node": {"value": values[i]}} for i in range(start, end)],
+            "pageInfo": {
+                "startCursor": str(start) if end > start else None,
+                "endCursor": str(end - 1) if end > start else None,
+                "hasNextPage": end < len(values),
+                "hasPreviousPage": start > 0
+            }
+        }}
+
+    return executor
+
+
+def offset_executor(values, requests, total_count=True):
+    """
+    returns an executor which pages through the values by arrayconnection cursors
+    """
+    async def executor(query, params):
+        requests.append(params)
+        await asyncio.sleep(0)
+        start = cursor_to_offset(params["after"]) + 1 if params.get("after") is not None else 0
+        end = min(start + params["first"], len(values))
+        connection = {
+            "edges": [{"cursor": offset_to_cursor(i), "node": {"value": values[i]}} for i in range(start, end)],
+            "pageInfo": {
+                "startCursor": offset_to_cursor(start),
+                "endCursor": offset_to_cursor(end - 1),
+                "hasNextPage": end < len(values),
+                "hasPreviousPage": start > 0
+            }
+        }
+        if total_count:
+            connection["totalCount"] = len(values)
+
+        return {"numericvalues": connection}
+
+    return executor
+
+
 class GqlRelayResultTests(IsolatedAsyncioTestCase):
 
     QUERY = """ 
@@ -312,13 +387,14 @@ class GqlRelayResultTests(IsolatedAsyncioTestCase):
     
     async def test_that_factory_method_works(self):
         gqlQuery = gql(GqlRelayResultTests.QUERY)
-        executor = MagicMock()
+        executor = AsyncMock()
         result = GqlRelayResultTests.FIRST_PAGE_RESULT
+        executor.return_value = GqlRelayResultTests.SECOND_PAGE_RESULT
 
         params = {'first': 5}
         sut = GqlRelayResult(result, gqlQuery, params, executor, lambda node: Data(node["node"]["value"]))
         
-        expeced = [Data(1), Data(2), Data(3), Data(4), Data(5)]
+        expeced = [Data(1), Data(2), Data(3), Data(4), Data(5), Data(6), Data(7), Data(8)]
         actual = []
         async for x in sut:
             actual.append(x)
@@ -375,4 +451,735 @@ class GqlRelayResultTests(IsolatedAsyncioTestCase):
         for x in await sut.all_from_current_page_async():
             actual.append(x["node"]["value"])
 
-        self.assertListEqual(expeced, actual)
\ No newline at end of file
+        self.assertListEqual(expeced, actual)
+
+    async def test_that_prefetch_iterates_through_multiple_pages(self):
+        gqlQuery = gql(GqlRelayResultTests.QUERY)
+        executor = AsyncMock()
+        result = GqlRelayResultTests.FIRST_PAGE_RESULT
+        executor.return_value = GqlRelayResultTests.SECOND_PAGE_RESULT
+
+        params = {'first': 5}
+        sut = GqlRelayResult(result, gqlQuery, params, executor, prefetch=2)
+
+        expeced = [1, 2, 3, 4, 5, 6, 7, 8]
+        actual = []
+        async for x in sut:
+            actual.append(x["node"]["value"])
+
+        self.assertListEqual(expeced, actual)
+        executor.assert_awaited_once_with(gqlQuery, {"first": 5, "after": "YXJyYXljb25uZWN0aW9uOjQ="})
+
+    async def test_that_prefetch_fetches_next_page_while_current_page_is_consumed(self):
+        gqlQuery = gql(GqlRelayResultTests.QUERY)
+        executor = AsyncMock()
+        result = GqlRelayResultTests.FIRST_PAGE_RESULT
+        executor.return_value = GqlRelayResultTests.SECOND_PAGE_RESULT
+
+        params = {'first': 5}
+        sut = GqlRelayResult(result, gqlQuery, params, executor, prefetch=1)
+
+        first = await sut.next()
+        await asyncio.sleep(0)
+
+        self.assertEqual(first["node"]["value"], 1)
+        self.assertEqual(executor.await_count, 1)
+        await sut.aclose()
+
+    async def test_that_iteration_continues_after_aclose(self):
+        sut = GqlRelayResult.from_query(gql(GqlRelayResultTests.QUERY), {'first': 3}, connection_executor(list(range(9)), []), node_value, prefetch=2)
+
+        first = [await sut.next() for _ in range(4)]
+        await sut.aclose()
+        rest = await asyncio.wait_for(IterableResult.fetch_all(sut), 1)
+
+        self.assertListEqual(list(range(9)), first + rest)
+
+    async def test_that_a_waiting_iteration_continues_if_prefetching_is_closed(self):
+        executor = connection_executor(list(range(9)), [])
+
+        async def slow_executor(query, params):
+            await asyncio.sleep(0.01)
+            return await executor(query, params)
+
+        sut = GqlRelayResult.from_query(gql(GqlRelayResultTests.QUERY), {'first': 3}, slow_executor, node_value, prefetch=1)
+        waiting = asyncio.ensure_future(IterableResult.fetch_all(sut))
+        await asyncio.sleep(0)
+        await sut.aclose()
+
+        self.assertListEqual(list(range(9)), await asyncio.wait_for(waiting, 1))
+
+    async def test_that_prefetching_iteration_continues_after_a_page_fetch_error(self):
+        values = list(range(9))
+        succeeding = connection_executor(values, [])
+        failures = []
+
+        async def executor(query, params):
+            if params.get("after") == "2" and not failures:
+                failures.append(params)
+                raise ConnectionError("connection reset")
+
+            return await succeeding(query, params)
+
+        sut = GqlRelayResult.from_query(gql(GqlRelayResultTests.QUERY), {'first': 3}, executor, node_value, prefetch=2)
+        first = []
+        with self.assertRaises(PageFetchError):
+            async for x in sut:
+                first.append(x)
+
+        rest = await asyncio.wait_for(IterableResult.fetch_all(sut), 1)
+
+        self.assertListEqual([0, 1, 2], first)
+        self.assertListEqual([3, 4, 5, 6, 7, 8], rest)
+
+    async def test_that_pages_yields_every_page_with_its_page_info(self):
+        gqlQuery = gql(GqlRelayResultTests.QUERY)
+        executor = AsyncMock()
+        result = GqlRelayResultTests.FIRST_PAGE_RESULT
+        executor.return_value = GqlRelayResultTests.SECOND_PAGE_RESULT
+
+        params = {'first': 5}
+        sut = GqlRelayResult(result, gqlQuery, params, executor, lambda node: Data(node["node"]["value"]))
+
+        expeced = [[Data(1), Data(2), Data(3), Data(4), Data(5)], [Data(6), Data(7), Data(8)]]
+        actual = []
+        cursors = []
+        async for items, page_info in sut.pages():
+            actual.append(items)
+            cursors.append(page_info.end_cursor)
+
+        self.assertListEqual(expeced, actual)
+        self.assertListEqual(["YXJyYXljb25uZWN0aW9uOjQ=", "YXJyYXljb25uZWN0aW9uOjc="], cursors)
+
+    async def test_that_pages_of_a_result_from_a_query_start_with_the_first_page(self):
+        gqlQuery = gql(GqlRelayResultTests.QUERY)
+        sut = GqlRelayResult.from_query(gqlQuery, {'first': 3}, connection_executor(list(range(10)), []))
+
+        actual = [len(items) async for items, _ in sut.pages()]
+
+        self.assertListEqual([3, 3, 3, 1], actual)
+
+    async def test_that_async_factory_runs_concurrently_and_preserves_order(self):
+        gqlQuery = gql(GqlRelayResultTests.QUERY)
+        executor = AsyncMock()
+        result = GqlRelayResultTests.FIRST_PAGE_RESULT
+        executor.return_value = GqlRelayResultTests.SECOND_PAGE_RESULT
+        running = []
+        max_running = []
+
+        async def factory(node):
+            running.append(node)
+            max_running.append(len(running))
+            # later items finish first
+            await asyncio.sleep(0.01 / node["node"]["value"])
+            running.remove(node)
+            return Data(node["node"]["value"])
+
+        params = {'first': 5}
+        sut = GqlRelayResult(result, gqlQuery, params, executor, factory, True, concurrency=2)
+
+        expeced = [Data(1), Data(2), Data(3), Data(4), Data(5), Data(6), Data(7), Data(8)]
+        actual = await IterableResult.fetch_all(sut)
+
+        self.assertListEqual(expeced, actual)
+        self.assertEqual(max(max_running), 2)
+
+    async def test_that_batch_factory_is_called_once_per_page(self):
+        gqlQuery = gql(GqlRelayResultTests.QUERY)
+        executor = AsyncMock()
+        result = GqlRelayResultTests.FIRST_PAGE_RESULT
+        executor.return_value = GqlRelayResultTests.SECOND_PAGE_RESULT
+        batch_factory = AsyncMock(side_effect=lambda edges: [Data(x["node"]["value"]) for x in edges])
+
+        params = {'first': 5}
+        sut = GqlRelayResult(result, gqlQuery, params, executor, is_async_factory=True, batch_factory=batch_factory)
+
+        expeced = [Data(1), Data(2), Data(3), Data(4), Data(5), Data(6), Data(7), Data(8)]
+        actual = await IterableResult.fetch_all(sut)
+
+        self.assertListEqual(expeced, actual)
+        self.assertEqual(batch_factory.await_count, 2)
+
+    async def test_that_async_factory_can_be_used_by_index_within_running_loop(self):
+        gqlQuery = gql(GqlRelayResultTests.QUERY)
+        executor = AsyncMock()
+        result = GqlRelayResultTests.FIRST_PAGE_RESULT
+
+        async def factory(node):
+            return Data(node["node"]["value"])
+
+        params = {'first': 5}
+        sut = GqlRelayResult(result, gqlQuery, params, executor, factory, True)
+
+        self.assertEqual(sut[1], Data(2))
+        self.assertListEqual([Data(1), Data(2), Data(3), Data(4), Data(5)], sut.all_from_current_page())
+
+    def test_that_materialize_returns_all_items_of_all_pages(self):
+        gqlQuery = gql(GqlRelayResultTests.QUERY)
+        executor = AsyncMock()
+        result = GqlRelayResultTests.FIRST_PAGE_RESULT
+        executor.return_value = GqlRelayResultTests.SECOND_PAGE_RESULT
+
+        async def factory(node):
+            return Data(node["node"]["value"])
+
+        params = {'first': 5}
+        sut = GqlRelayResult(result, gqlQuery, params, executor, factory, True)
+
+        expeced = [Data(1), Data(2), Data(3), Data(4), Data(5), Data(6), Data(7), Data(8)]
+        self.assertListEqual(expeced, sut.materialize())
+
+    async def test_that_children_of_all_nodes_are_resolved_by_one_batch_resolver_call(self):
+        gqlQuery = gql(GqlRelayResultTests.QUERY)
+        executor = MagicMock()
+        result = copy.deepcopy(GqlRelayResultTests.NESTED_RESULT)
+        batch_resolver = AsyncMock(return_value=[[{"node": {"value": "subitem_3"}}, {"node": {"value": "subitem_4"}}]])
+
+        async def batch_factory(edges):
+            nodes = [x["node"] for x in edges]
+            children = await SubResult.get_all_children_from_nodes(nodes, "subElementsSet", lambda node: {"id": node["id"]}, None, lambda x: Data.create(x), batch_resolver=batch_resolver)
+            return [DataWithId(children=c, **node) for node, c in zip(nodes, children)]
+
+        params = {'first': 5}
+        sut = GqlRelayResult(result, gqlQuery, params, executor, is_async_factory=True, batch_factory=batch_factory)
+        actual = await IterableResult.fetch_all(sut)
+
+        batch_resolver.assert_awaited_once_with([{"id": "id3", "after": "YXJyYXljb25uZWN0aW9uOjA="}])
+        self.assertListEqual([0, 0, 4], [len(x.children) for x in actual])
+        self.assertListEqual([Data("subitem_1"), Data("subitem_2"), Data("subitem_3"), Data("subitem_4")], actual[2].children)
+
+    async def test_that_children_of_all_nodes_are_resolved_concurrently(self):
+        result = copy.deepcopy(GqlRelayResultTests.NESTED_RESULT)
+        nodes = [x["node"] for x in result["numericvalues"]["edges"]]
+        nodes[0]["subElementsSet"] = copy.deepcopy(nodes[2]["subElementsSet"])
+
+        resolver = AsyncMock(side_effect=lambda id, after: [Data(id), Data(after)])
+
+        children = await SubResult.get_all_children_from_nodes(nodes, "subElementsSet", lambda node: {"id": node["id"]}, resolver, lambda x: Data.create(x), False, True, concurrency=2)
+
+        self.assertListEqual([4, 0, 4], [len(x) for x in children])
+        self.assertEqual(resolver.await_count, 2)
+        self.assertEqual(children[2][2], Data("id3"))
+
+    async def test_that_from_query_fetches_the_first_page_when_iterating(self):
+        gqlQuery = gql(GqlRelayResultTests.QUERY)
+        executor = AsyncMock(side_effect=[GqlRelayResultTests.FIRST_PAGE_RESULT, GqlRelayResultTests.SECOND_PAGE_RESULT])
+
+        params = {'first': 5}
+        sut = GqlRelayResult.from_query(gqlQuery, params, executor)
+
+        actual = [x["node"]["value"] for x in await IterableResult.fetch_all(sut)]
+
+        self.assertListEqual([1, 2, 3, 4, 5, 6, 7, 8], actual)
+        executor.assert_has_awaits([call(gqlQuery, {"first": 5, "after": None}), call(gqlQuery, {"first": 5, "after": "YXJyYXljb25uZWN0aW9uOjQ="})])
+
+    async def test_that_fan_out_pages_all_requests_concurrently(self):
+        gqlQuery = gql(GqlRelayResultTests.QUERY)
+        running = []
+        max_running = []
+
+        async def executor(query, params):
+            running.append(params)
+            max_running.append(len(running))
+            await asyncio.sleep(0.01)
+            running.remove(params)
+            return GqlRelayResultTests.FIRST_PAGE_RESULT if params["after"] is None else GqlRelayResultTests.SECOND_PAGE_RESULT
+
+        requests = [(gqlQuery, {'first': 5, 'tenant': tenant}) for tenant in range(3)]
+        actual = {}
+        async for index, items in GqlRelayResult.fan_out(requests, executor, concurrency=2, grouped=True):
+            actual[index] = [x["node"]["value"] for x in items]
+
+        self.assertDictEqual({index: [1, 2, 3, 4, 5, 6, 7, 8] for index in range(3)}, actual)
+        self.assertEqual(max(max_running), 2)
+
+    async def test_that_fan_out_yields_items_as_they_arrive(self):
+        gqlQuery = gql(GqlRelayResultTests.QUERY)
+
+        async def executor(query, params):
+            return GqlRelayResultTests.FIRST_PAGE_RESULT if params["after"] is None else GqlRelayResultTests.SECOND_PAGE_RESULT
+
+        requests = [(gqlQuery, {'first': 5, 'tenant': tenant}) for tenant in range(2)]
+        actual = [(index, x["node"]["value"]) async for index, x in GqlRelayResult.fan_out(requests, executor)]
+
+        self.assertEqual(len(actual), 16)
+        self.assertListEqual([1, 2, 3, 4, 5, 6, 7, 8], [value for index, value in actual if index == 1])
+
+    async def test_that_adaptive_page_size_grows_on_fast_pages(self):
+        gqlQuery = gql(GqlRelayResultTests.QUERY)
+        executor = AsyncMock(side_effect=[GqlRelayResultTests.FIRST_PAGE_RESULT, GqlRelayResultTests.SECOND_PAGE_RESULT])
+        result = GqlRelayResultTests.FIRST_PAGE_RESULT
+        page_size = AdaptivePageSize(2, 8, target_seconds=60)
+
+        params = {'first': 5}
+        sut = GqlRelayResult(result, gqlQuery, params, executor, page_size=page_size)
+        actual = await IterableResult.fetch_all(sut)
+
+        self.assertEqual(len(actual), 13)
+        self.assertListEqual([5, 8], [x[0] for x in page_size.history])
+        executor.assert_has_awaits([call(gqlQuery, {"first": 5, "after": "YXJyYXljb25uZWN0aW9uOjQ="}), call(gqlQuery, {"first": 8, "after": "YXJyYXljb25uZWN0aW9uOjQ="})])
+
+    def test_that_adaptive_page_size_shrinks_on_slow_pages_and_errors(self):
+        sut = AdaptivePageSize(10, 100, target_seconds=1.0)
+
+        self.assertEqual(sut.next_size(80), 80)
+        sut.record(80, 2.0)
+        self.assertEqual(sut.next_size(), 40)
+        sut.record(40, 0.7)
+        self.assertEqual(sut.next_size(), 40)
+        sut.record(40, 0.1, False)
+        self.assertEqual(sut.next_size(), 20)
+        sut.record(20, 5.0)
+        self.assertEqual(sut.next_size(), 10)
+
+    async def test_that_failed_pages_are_retried(self):
+        gqlQuery = gql(GqlRelayResultTests.QUERY)
+        executor = AsyncMock(side_effect=[ConnectionError(), GqlRelayResultTests.SECOND_PAGE_RESULT])
+        result = GqlRelayResultTests.FIRST_PAGE_RESULT
+
+        params = {'first': 5}
+        sut = GqlRelayResult(result, gqlQuery, params, executor, retry=RetryPolicy(attempts=2, base_delay=0))
+
+        actual = [x["node"]["value"] for x in await IterableResult.fetch_all(sut)]
+
+        self.assertListEqual([1, 2, 3, 4, 5, 6, 7, 8], actual)
+        self.assertEqual(executor.await_count, 2)
+
+    async def test_that_iteration_can_be_resumed_after_retries_are_exhausted(self):
+        gqlQuery = gql(GqlRelayResultTests.QUERY)
+        executor = AsyncMock(side_effect=[ConnectionError(), ConnectionError(), GqlRelayResultTests.SECOND_PAGE_RESULT])
+        result = GqlRelayResultTests.FIRST_PAGE_RESULT
+
+        params = {'first': 5}
+        sut = GqlRelayResult(result, gqlQuery, params, executor, retry=RetryPolicy(attempts=2, base_delay=0))
+
+        actual = []
+        with self.assertRaises(PageFetchError) as context:
+            async for x in sut:
+                actual.append(x["node"]["value"])
+
+        self.assertEqual(context.exception.end_cursor, "YXJyYXljb25uZWN0aW9uOjQ=")
+        self.assertIsInstance(context.exception.error, ConnectionError)
+
+        resumed = GqlRelayResult.from_query(gqlQuery, params, executor, after=context.exception.end_cursor)
+        async for x in resumed:
+            actual.append(x["node"]["value"])
+
+        self.assertListEqual([1, 2, 3, 4, 5, 6, 7, 8], actual)
+        executor.assert_awaited_with(gqlQuery, {"first": 5, "after": "YXJyYXljb25uZWN0aW9uOjQ="})
+
+    async def test_that_failing_resolver_raises_page_fetch_error(self):
+        result = copy.deepcopy(GqlRelayResultTests.NESTED_RESULT)
+        node = result["numericvalues"]["edges"][2]["node"]
+        resolver = AsyncMock(side_effect=ConnectionError())
+
+        with self.assertRaises(PageFetchError) as context:
+            await SubResult.get_all_children_from_node(node, "subElementsSet", {"id": "id3"}, resolver, None)
+
+        self.assertEqual(context.exception.end_cursor, "YXJyYXljb25uZWN0aW9uOjA=")
+
+    async def test_that_cached_pages_are_not_fetched_again(self):
+        gqlQuery = gql(GqlRelayResultTests.QUERY)
+        executor = AsyncMock(side_effect=[GqlRelayResultTests.FIRST_PAGE_RESULT, GqlRelayResultTests.SECOND_PAGE_RESULT])
+        cache = MemoryPageCache()
+
+        params = {'first': 5}
+        first = await IterableResult.fetch_all(GqlRelayResult.from_query(gqlQuery, params, executor, cache=cache))
+        second = await IterableResult.fetch_all(GqlRelayResult.from_query(gqlQuery, params, executor, cache=cache))
+
+        self.assertListEqual(first, second)
+        self.assertEqual(executor.await_count, 2)
+        self.assertDictEqual({"hits": 2, "misses": 2, "evictions": 0, "errors": 0}, cache.stats())
+
+    async def test_that_pages_which_cant_be_cached_are_not_fetched_again(self):
+        gqlQuery = gql(GqlRelayResultTests.QUERY)
+        page = copy.deepcopy(GqlRelayResultTests.SECOND_PAGE_RESULT)
+        page["numericvalues"]["edges"][0]["node"]["created"] = datetime.datetime(2020, 1, 1)
+        executor = AsyncMock(return_value=page)
+        cache = MemoryPageCache()
+
+        actual = await IterableResult.fetch_all(GqlRelayResult.from_query(gqlQuery, {'first': 5}, executor, cache=cache, retry=RetryPolicy(attempts=3, base_delay=0)))
+
+        self.assertEqual(len(actual), 3)
+        self.assertEqual(executor.await_count, 1)
+        self.assertEqual(cache.errors, 1)
+
+    async def test_that_streaming_releases_consumed_edges(self):
+        class Edge(dict):
+            pass
+
+        gqlQuery = gql(GqlRelayResultTests.QUERY)
+        executor = AsyncMock()
+        edges = [Edge(node={"value": value}) for value in range(3)]
+        references = [weakref.ref(x) for x in edges]
+        result = {"numericvalues": {"edges": edges, "pageInfo": GqlRelayResultTests.SINGLE_PAGE_RESULT["numericvalues"]["pageInfo"]}}
+
+        params = {'first': 5}
+        sut = GqlRelayResult(result, gqlQuery, params, executor, lambda node: Data(node["node"]["value"]), streaming=True)
+        del edges, result
+
+        await sut.next()
+        await sut.next()
+        gc.collect()
+
+        self.assertListEqual([True, True, False], [x() is None for x in references])
+
+    async def test_that_fetch_into_writes_items_incrementally(self):
+        gqlQuery = gql(GqlRelayResultTests.QUERY)
+        executor = AsyncMock()
+        result = GqlRelayResultTests.FIRST_PAGE_RESULT
+        executor.return_value = GqlRelayResultTests.SECOND_PAGE_RESULT
+        sink = io.StringIO()
+
+        params = {'first': 5}
+        sut = GqlRelayResult(result, gqlQuery, params, executor, lambda node: node["node"]["value"], streaming=True)
+        count = await IterableResult.fetch_into(sut, sink)
+
+        self.assertEqual(count, 8)
+        self.assertListEqual([1, 2, 3, 4, 5, 6, 7, 8], [json.loads(x) for x in sink.getvalue().splitlines()])
+
+    async def test_that_fetch_into_calls_async_sink(self):
+        gqlQuery = gql(GqlRelayResultTests.QUERY)
+        executor = AsyncMock()
+        result = GqlRelayResultTests.SINGLE_PAGE_RESULT
+        actual = []
+
+        async def sink(x):
+            actual.append(x["node"]["value"])
+
+        params = {'first': 5}
+        count = await IterableResult.fetch_into(GqlRelayResult(result, gqlQuery, params, executor), sink)
+
+        self.assertEqual(count, 2)
+        self.assertListEqual([1, 2], actual)
+
+    async def test_that_compact_edges_keep_projected_fields(self):
+        gqlQuery = gql(GqlRelayResultTests.QUERY)
+        executor = AsyncMock()
+        result = copy.deepcopy(GqlRelayResultTests.NESTED_RESULT)
+
+        params = {'first': 5}
+        sut = GqlRelayResult(result, gqlQuery, params, executor, fields=["id", "value"])
+        actual = await IterableResult.fetch_all(sut)
+
+        self.assertIsInstance(actual[0], CompactEdge)
+        self.assertListEqual(["id1", "id2", "id3"], [x["node"]["id"] for x in actual])
+        self.assertDictEqual({"node": {"id": "id3", "value": 8}}, dict(actual[2]))
+        self.assertListEqual([6, 7, 8], [x["node"]["value"] for x in actual])
+
+    def test_that_compact_fields_can_be_named_like_mapping_methods(self):
+        edge = CompactEdge.type_for(("get", "value")).from_edge({"cursor": "c", "node": {"get": 5, "value": 6}})
+
+        self.assertDictEqual({"get": 5, "value": 6}, edge["node"])
+        self.assertEqual("c", edge.get("cursor"))
+
+    async def test_that_to_columns_collects_fields_of_all_pages(self):
+        gqlQuery = gql(GqlRelayResultTests.QUERY)
+        executor = AsyncMock()
+        result = GqlRelayResultTests.FIRST_PAGE_RESULT
+        executor.return_value = GqlRelayResultTests.SECOND_PAGE_RESULT
+
+        params = {'first': 5}
+        sut = GqlRelayResult(result, gqlQuery, params, executor)
+        actual = await sut.to_columns(["value"], {"value": "q"}, use_numpy=False)
+
+        self.assertEqual(array.array("q", [1, 2, 3, 4, 5, 6, 7, 8]), actual["value"])
+
+    async def test_that_to_columns_resolves_nested_fields(self):
+        gqlQuery = gql(GqlRelayResultTests.QUERY)
+        executor = AsyncMock()
+        result = {"numericvalues": {
+            "edges": [{"node": {"stats": {"count": 3}}}, {"node": {"stats": None}}],
+            "pageInfo": GqlRelayResultTests.SINGLE_PAGE_RESULT["numericvalues"]["pageInfo"]
+        }}
+
+        params = {'first': 5}
+        sut = GqlRelayResult(result, gqlQuery, params, executor)
+        actual = (await sut.to_columns(["stats.count"], use_numpy=False))["stats.count"]
+
+        self.assertEqual(actual[0], 3.0)
+        self.assertTrue(math.isnan(actual[1]))
+
+    async def test_that_to_columns_rejects_null_values_in_integer_columns(self):
+        gqlQuery = gql(GqlRelayResultTests.QUERY)
+        result = {"numericvalues": {
+            "edges": [{"node": {"stats": {"count": 3}}}, {"node": {"stats": {"count": None}}}],
+            "pageInfo": GqlRelayResultTests.SINGLE_PAGE_RESULT["numericvalues"]["pageInfo"]
+        }}
+
+        sut = GqlRelayResult(result, gqlQuery, {'first': 5}, AsyncMock())
+        with self.assertRaises(ValueError) as context:
+            await sut.to_columns(["stats.count"], {"stats.count": "q"}, use_numpy=False)
+
+        self.assertIn("'stats.count'", str(context.exception))
+
+    @unittest.skipIf(importlib.util.find_spec("numpy") is None, "numpy is not installed")
+    async def test_that_to_columns_returns_numpy_arrays(self):
+        gqlQuery = gql(GqlRelayResultTests.QUERY)
+        executor = AsyncMock()
+        result = GqlRelayResultTests.FIRST_PAGE_RESULT
+        executor.return_value = GqlRelayResultTests.SECOND_PAGE_RESULT
+
+        params = {'first': 5}
+        sut = GqlRelayResult(result, gqlQuery, params, executor, fields=["value"])
+        actual = await sut.to_columns(["value"])
+
+        self.assertEqual(actual["value"].dtype.char, "d")
+        self.assertListEqual([1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0], actual["value"].tolist())
+
+    async def test_that_to_columns_reads_compact_fields_named_like_mapping_methods(self):
+        gqlQuery = gql(GqlRelayResultTests.QUERY)
+        result = {"numericvalues": {
+            "edges": [{"node": {"value": 1, "items": 3}}, {"node": {"value": 2, "items": 4}}],
+            "pageInfo": GqlRelayResultTests.SINGLE_PAGE_RESULT["numericvalues"]["pageInfo"]
+        }}
+
+        sut = GqlRelayResult(result, gqlQuery, {'first': 5}, AsyncMock(), fields=["value", "items"])
+        actual = await sut.to_columns(["items"], {"items": "q"}, use_numpy=False)
+
+        self.assertEqual(array.array("q", [3, 4]), actual["items"])
+
+    NESTED_CONNECTION_QUERY = """
+            query getRepositories($first: Int, $after: String) {
+                viewer {
+                    ... on User {
+                        repos: repositories(first: $first, after: $after) {
+                            pageInfo {
+                              hasNextPage,
+                              hasPreviousPage,
+                              startCursor,
+                              endCursor
+                            }
+                            edges {
+                                node {
+                                    value
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+            """
+
+    async def test_that_nested_connection_is_found_by_query(self):
+        gqlQuery = gql(GqlRelayResultTests.NESTED_CONNECTION_QUERY)
+        executor = AsyncMock(return_value={"viewer": {"repos": GqlRelayResultTests.SECOND_PAGE_RESULT["numericvalues"]}})
+        result = {"viewer": {"repos": GqlRelayResultTests.FIRST_PAGE_RESULT["numericvalues"]}}
+
+        params = {'first': 5}
+        sut = GqlRelayResult(result, gqlQuery, params, executor)
+        actual = [x["node"]["value"] for x in await IterableResult.fetch_all(sut)]
+
+        self.assertListEqual([1, 2, 3, 4, 5, 6, 7, 8], actual)
+
+    async def test_that_nested_connection_is_found_by_connection_path(self):
+        executor = AsyncMock(return_value={"viewer": {"repos": GqlRelayResultTests.SECOND_PAGE_RESULT["numericvalues"]}})
+        result = {"viewer": {"repos": GqlRelayResultTests.FIRST_PAGE_RESULT["numericvalues"]}}
+
+        params = {'first': 5}
+        sut = GqlRelayResult(result, "getRepositories", params, executor, connection_path="viewer.repos")
+        actual = [x["node"]["value"] for x in await IterableResult.fetch_all(sut)]
+
+        self.assertListEqual([1, 2, 3, 4, 5, 6, 7, 8], actual)
+
+    async def test_that_raw_responses_are_decoded(self):
+        gqlQuery = gql(GqlRelayResultTests.QUERY)
+        executor = AsyncMock(return_value=json.dumps({"data": GqlRelayResultTests.SECOND_PAGE_RESULT}).encode("utf-8"))
+        result = GqlRelayResultTests.FIRST_PAGE_RESULT
+
+        params = {'first': 5}
+        sut = GqlRelayResult(result, gqlQuery, params, executor, decoder="json")
+        actual = [x["node"]["value"] for x in await IterableResult.fetch_all(sut)]
+
+        self.assertListEqual([1, 2, 3, 4, 5, 6, 7, 8], actual)
+
+    async def test_that_visited_pages_are_fetched_again_by_a_single_request(self):
+        requests = []
+        sut = SeekableRelayResult.from_query(gql(GqlRelayResultTests.QUERY), {'first': 3}, connection_executor(list(range(10)), requests))
+
+        self.assertListEqual(list(range(10)), [x["node"]["value"] for x in await IterableResult.fetch_all(sut)])
+        self.assertEqual(sut.known_pages, 4)
+
+        await sut.seek(1)
+        self.assertEqual(sut.page_number, 1)
+        self.assertEqual(len(requests), 5)
+        self.assertEqual(requests[-1]["after"], "2")
+        self.assertListEqual([3, 4, 5, 6, 7, 8, 9], [x["node"]["value"] async for x in sut])
+
+    async def test_that_tail_pages_backwards(self):
+        requests = []
+        executor = connection_executor(list(range(100)), requests)
+
+        actual = await SeekableRelayResult.tail(gql(GqlRelayResultTests.QUERY), {'first': 10, 'last': 4}, executor, 6)
+
+        self.assertListEqual([94, 95, 96, 97, 98, 99], [x["node"]["value"] for x in actual])
+        self.assertListEqual([{"last": 4, "before": None}, {"last": 4, "before": "96"}], requests)
+
+    async def test_that_incremental_result_yields_only_new_edges(self):
+        gqlQuery = gql(GqlRelayResultTests.QUERY)
+        store = MemoryStateStore()
+        values = list(range(7))
+        requests = []
+
+        first = await GqlRelayResult.incremental(gqlQuery, {'first': 3}, connection_executor(values, requests), store)
+        self.assertListEqual(list(range(7)), [x["node"]["value"] async for x in first])
+        self.assertTrue(first.full_scan)
+
+        unchanged = await GqlRelayResult.incremental(gqlQuery, {'first': 3}, connection_executor(values, requests), store)
+        self.assertListEqual([], [x["node"]["value"] async for x in unchanged])
+
+        values += [7, 8]
+        second = await GqlRelayResult.incremental(gqlQuery, {'first': 3}, connection_executor(values, requests), store)
+        self.assertListEqual([7, 8], [x["node"]["value"] async for x in second])
+        self.assertFalse(second.full_scan)
+        self.assertEqual(requests[-1]["after"], "6")
+        self.assertEqual(list(store._states.values())[0]["end_cursor"], "8")
+
+    async def test_that_incremental_result_falls_back_to_a_full_scan(self):
+        gqlQuery = gql(GqlRelayResultTests.QUERY)
+        store = MemoryStateStore()
+
+        store.set("rejected", {"end_cursor": "50"})
+        rejected = await GqlRelayResult.incremental(gqlQuery, {'first': 3}, connection_executor([0, 1], []), store, key="rejected")
+        self.assertListEqual([0, 1], [x["node"]["value"] async for x in rejected])
+        self.assertTrue(rejected.full_scan)
+
+        first = await GqlRelayResult.incremental(gqlQuery, {'first': 3}, connection_executor([0, 1, 2, 3], []), store, key="values", checksum=True)
+        self.assertEqual(len([x async for x in first]), 4)
+
+        changed = await GqlRelayResult.incremental(gqlQuery, {'first': 3}, connection_executor([9, 1, 2, 3, 4], []), store, key="values", checksum=True)
+        self.assertListEqual([9, 1, 2, 3, 4], [x["node"]["value"] async for x in changed])
+        self.assertTrue(changed.full_scan)
+        self.assertEqual(store.get("values")["end_cursor"], "4")
+
+    async def test_that_incremental_result_raises_network_errors_while_resuming(self):
+        gqlQuery = gql(GqlRelayResultTests.QUERY)
+        store = MemoryStateStore()
+        store.set("values", {"end_cursor": "3"})
+
+        async def executor(query, params):
+            raise ConnectionError("connection reset")
+
+        sut = await GqlRelayResult.incremental(gqlQuery, {'first': 3}, executor, store, key="values")
+
+        with self.assertRaises(PageFetchError):
+            await IterableResult.fetch_all(sut)
+        self.assertFalse(sut.full_scan)
+        self.assertEqual(store.get("values")["end_cursor"], "3")
+
+    async def test_that_incremental_result_verifies_the_checksum_of_projected_fields(self):
+        gqlQuery = gql(GqlRelayResultTests.QUERY)
+        store = MemoryStateStore()
+        values = [0, 1, 2, 3]
+
+        first = await GqlRelayResult.incremental(gqlQuery, {'first': 3}, connection_executor(values, []), store, checksum=True, fields=["value"])
+        self.assertEqual(len([x async for x in first]), 4)
+
+        values.append(4)
+        second = await GqlRelayResult.incremental(gqlQuery, {'first': 3}, connection_executor(values, []), store, checksum=True, fields=["value"])
+        self.assertListEqual([4], [x["node"]["value"] async for x in second])
+        self.assertFalse(second.full_scan)
+
+    def test_that_offset_cursors_are_converted(self):
+        self.assertEqual(offset_to_cursor(4), "YXJyYXljb25uZWN0aW9uOjQ=")
+        self.assertEqual(cursor_to_offset("YXJyYXljb25uZWN0aW9uOjQ="), 4)
+        self.assertIsNone(cursor_to_offset("opaque"))
+        self.assertIsNone(cursor_to_offset(None))
+
+    async def test_that_segmented_scan_pages_through_segments_concurrently(self):
+        gqlQuery = gql(GqlRelayResultTests.QUERY)
+        requests = []
+        executor = offset_executor(list(range(100)), requests)
+
+        actual = [x["node"]["value"] async for x in GqlRelayResult.segmented_scan(gqlQuery, {'first': 10}, executor, segments=3)]
+
+        self.assertListEqual(list(range(100)), actual)
+        self.assertListEqual([None, offset_to_cursor(9), offset_to_cursor(39), offset_to_cursor(69)], [x["after"] for x in requests[:4]])
+        self.assertEqual(len(requests), 10)
+
+        unordered = [x["node"]["value"] async for x in GqlRelayResult.segmented_scan(gqlQuery, {'first': 7}, executor, segments=4, ordered=False)]
+        self.assertListEqual(list(range(100)), sorted(unordered))
+
+    async def test_that_ordered_segmented_scan_bounds_the_buffered_pages(self):
+        gqlQuery = gql(GqlRelayResultTests.QUERY)
+        requests = []
+        executor = offset_executor(list(range(100)), requests)
+        scan = GqlRelayResult.segmented_scan(gqlQuery, {'first': 10}, executor, segments=3, segment_buffer=1)
+
+        # the first page and the first page of the first segment
+        actual = [(await scan.__anext__())["node"]["value"] for _ in range(11)]
+        for _ in range(20):
+            await asyncio.sleep(0)
+        await scan.aclose()
+
+        self.assertListEqual(list(range(11)), actual)
+        # the later segments wait with their third page until the first segment has been yielded
+        self.assertLessEqual(len(requests), 8)
+
+    async def test_that_segmented_scan_falls_back_to_sequential_paging(self):
+        gqlQuery = gql(GqlRelayResultTests.QUERY)
+        requests = []
+        executor = offset_executor(list(range(20)), requests, total_count=False)
+
+        actual = [x["node"]["value"] async for x in GqlRelayResult.segmented_scan(gqlQuery, {'first': 5}, executor)]
+
+        self.assertListEqual(list(range(20)), actual)
+        self.assertListEqual([None, offset_to_cursor(4), offset_to_cursor(9), offset_to_cursor(14)], [x["after"] for x in requests])
+
+    async def test_that_factory_executor_creates_items_in_chunks_and_order(self):
+        requests = []
+        chunks = []
+
+        def factory(edge):
+            chunks.append(edge["node"]["value"])
+            return edge["node"]["value"] * 2
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=3) as pool:
+            sut = GqlRelayResult.from_query(gql(GqlRelayResultTests.QUERY), {'first': 10}, connection_executor(list(range(25)), requests),
+                                            factory, factory_executor=pool, factory_chunk_size=4, prefetch=1)
+            actual = await IterableResult.fetch_all(sut)
+
+            pages = GqlRelayResult.from_query(gql(GqlRelayResultTests.QUERY), {'first': 10}, connection_executor(list(range(25)), requests),
+                                              factory, factory_executor=pool, factory_chunk_size=4)
+            first_page = [items async for items, _ in pages.pages()][0]
+
+        self.assertListEqual([x * 2 for x in range(25)], actual)
+        self.assertListEqual([x * 2 for x in range(10)], first_page)
+        self.assertEqual(len(chunks), 50)
+
+    async def test_that_factory_executor_runs_factory_in_processes(self):
+        with concurrent.futures.ProcessPoolExecutor(max_workers=2) as pool:
+            sut = GqlRelayResult.from_query(gql(GqlRelayResultTests.QUERY), {'first': 10}, connection_executor(list(range(30)), []),
+                                            node_value, factory_executor=pool, factory_chunk_size=5)
+            actual = await IterableResult.fetch_all(sut)
+
+        self.assertListEqual(list(range(30)), actual)
+
+    async def test_that_compact_edges_are_sent_to_a_process_pool(self):
+        with concurrent.futures.ProcessPoolExecutor(max_workers=1) as pool:
+            sut = GqlRelayResult.from_query(gql(GqlRelayResultTests.QUERY), {'first': 10}, connection_executor(list(range(30)), []),
+                                            node_value, fields=["value"], factory_executor=pool, factory_chunk_size=5)
+            actual = await IterableResult.fetch_all(sut)
+
+        self.assertListEqual(list(range(30)), actual)
+        edge = CompactEdge.type_for(["id", "value"]).from_edge({"cursor": "c", "node": {"id": 1, "value": 2}})
+        self.assertDictEqual(dict(edge), dict(pickle.loads(pickle.dumps(edge))))
+
+    async def test_that_pooled_factory_time_is_observed(self):
+        observer = MagicMock()
+        executor = connection_executor(list(range(30)), [])
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as pool:
+            sut = GqlRelayResult(await executor("query", {'first': 10}), gql(GqlRelayResultTests.QUERY), {'first': 10}, executor,
+                                 node_value, factory_executor=pool, observer=observer)
+            self.assertEqual(sut[3], 3)
+            await IterableResult.fetch_all(sut)
+
+        self.assertEqual(sum(x.args[1] for x in observer.on_factory.call_args_list), 30)
+
+    def test_that_factory_executor_rejects_async_factories(self):
+        async def factory(edge):
+            return edge
+
+        with concurrent.futures.ThreadPoolExecutor() as pool:
+            with self.assertRaises(ValueError):
+                GqlRelayResult({}, "query", {}, AsyncMock(), factory, True, factory_executor=pool)
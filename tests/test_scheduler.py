@@ -0,0 +1,68 @@
+import asyncio
+import time
+from unittest import IsolatedAsyncioTestCase
+from gql_relay_result.relay_result import GqlRelayResult, IterableResult
+from gql_relay_result.scheduler import BULK, INTERACTIVE, RequestScheduler, TokenBucket
+
+
+def page(values, has_next, remaining=None):
+    result = {"numericvalues": {
+        "edges": [{"node": {"value": x}} for x in values],
+        "pageInfo": {"startCursor": None, "endCursor": str(values[-1]), "hasNextPage": has_next, "hasPreviousPage": False}
+    }}
+    if remaining is not None:
+        result["rateLimit"] = {"remaining": remaining, "resetIn": 0.05}
+
+    return result
+
+
+class RequestSchedulerTests(IsolatedAsyncioTestCase):
+
+    def test_that_token_bucket_delays_until_tokens_are_refilled(self):
+        sut = TokenBucket(rate=10, burst=2)
+        now = time.monotonic() + 1
+
+        sut.take(2, now)
+
+        self.assertAlmostEqual(sut.delay(1, now), 0.1)
+        self.assertAlmostEqual(sut.delay(5, now), 0.2)
+        self.assertAlmostEqual(sut.delay(1, now + 0.1), 0)
+
+    async def test_that_requests_are_limited_by_rate_and_cost(self):
+        sut = RequestScheduler(rate=100, burst=1, cost_rate=1000, cost_burst=10)
+
+        start = time.monotonic()
+        await asyncio.gather(*[sut.acquire(sut.estimate({"first": 10})) for _ in range(4)])
+
+        # every request costs the whole cost burst which is refilled after 10ms
+        self.assertGreaterEqual(time.monotonic() - start, 0.029)
+        self.assertEqual(sut.dispatched, 4)
+
+    async def test_that_requests_with_higher_priority_are_dispatched_first(self):
+        sut = RequestScheduler(rate=50, burst=1)
+        order = []
+
+        async def request(name, handle):
+            await handle.acquire(1)
+            order.append(name)
+
+        await sut.acquire(1)
+        await asyncio.gather(request("bulk", sut.with_priority(BULK)), request("bulk", sut.with_priority(BULK)),
+                             request("interactive", sut.with_priority(INTERACTIVE)))
+
+        self.assertListEqual(["interactive", "bulk", "bulk"], order)
+
+    async def test_that_results_wait_for_the_reset_of_an_exhausted_budget(self):
+        sut = RequestScheduler(budget=lambda result: (result["rateLimit"]["remaining"], result["rateLimit"]["resetIn"]) if "rateLimit" in result else None)
+        pages = [page([3, 4], True, remaining=0), page([5], False, remaining=10)]
+        times = []
+
+        async def executor(query, params):
+            times.append(time.monotonic())
+            return pages.pop(0)
+
+        first = GqlRelayResult(page([1, 2], True), "query", {"first": 2}, executor, scheduler=sut)
+        actual = [x["node"]["value"] for x in await IterableResult.fetch_all(first)]
+
+        self.assertListEqual([1, 2, 3, 4, 5], actual)
+        self.assertGreaterEqual(times[1] - times[0], 0.04)
@@ -0,0 +1,43 @@
+import os
+import tempfile
+import unittest
+from gql_relay_result.sync import JsonFileStateStore, MemoryStateStore, SyncStateStore, page_checksum
+
+
+class SyncStateStoreTests(unittest.TestCase):
+
+    def test_that_json_file_store_keeps_states_of_all_keys(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "sync.json")
+            sut = JsonFileStateStore(path)
+
+            self.assertIsNone(sut.get("a"))
+            sut.set("a", {"end_cursor": "1"})
+            sut.set("b", {"end_cursor": "2", "checksum": "c"})
+
+            actual = JsonFileStateStore(path)
+            self.assertDictEqual({"end_cursor": "1"}, actual.get("a"))
+            self.assertDictEqual({"end_cursor": "2", "checksum": "c"}, actual.get("b"))
+            self.assertListEqual(["sync.json"], os.listdir(directory))
+
+    def test_that_memory_store_returns_copies(self):
+        sut = MemoryStateStore()
+
+        sut.set("a", {"end_cursor": "1"})
+        sut.get("a")["end_cursor"] = "2"
+
+        self.assertEqual(sut.get("a")["end_cursor"], "1")
+
+    def test_that_incomplete_stores_cant_be_created(self):
+        class ReadOnlyStore(SyncStateStore):
+            def get(self, key):
+                return None
+
+        with self.assertRaises(TypeError):
+            ReadOnlyStore()
+
+    def test_that_checksum_depends_on_the_edges(self):
+        edges = [{"cursor": "0", "node": {"value": 1}}]
+
+        self.assertEqual(page_checksum(edges), page_checksum([{"node": {"value": 1}, "cursor": "0"}]))
+        self.assertNotEqual(page_checksum(edges), page_checksum([{"cursor": "0", "node": {"value": 2}}]))